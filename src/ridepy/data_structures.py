@@ -1,3 +1,5 @@
+import sys
+
 from collections.abc import Iterator
 
 from numpy import inf
@@ -10,8 +12,13 @@ from typing import Any, Optional, Union, Tuple, List, Callable
 ID = Union[str, int]
 """Generic ID, could be vehicle ID, request ID, ..."""
 
+# Requests and stops are created and read in the dispatchers' hot paths. Where
+# supported, store their fields in slots rather than an instance dict, which
+# makes them smaller and speeds up attribute access.
+_slots = dict(slots=True) if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
+@dataclass(**_slots)
 class Request:
     """
     A request for the system to perform a task
@@ -21,7 +28,7 @@ class Request:
     creation_timestamp: float
 
 
-@dataclass
+@dataclass(**_slots)
 class TransportationRequest(Request):
     """
     A request for the system to perform a transportation task,
@@ -37,7 +44,7 @@ class TransportationRequest(Request):
     delivery_timewindow_max: float = inf
 
 
-@dataclass
+@dataclass(**_slots)
 class InternalRequest(Request):
     """
     A request for the system to perform some action at a specific location
@@ -74,7 +81,7 @@ class LocType(Enum):
     INT = 2
 
 
-@dataclass
+@dataclass(**_slots)
 class Stop:
     """
     The notion of an action to be performed in fulfilling a request.
@@ -142,6 +149,28 @@ class TransportSpace(ABC):
 
         ...
 
+    def t_many(self, origins, destinations) -> List[Union[int, float]]:
+        """
+        Return travel times between pairs of points, the i-th of which is the
+        travel time from ``origins[i]`` to ``destinations[i]``.
+
+        By default, `t` is evaluated for each pair. Spaces that can compute
+        many travel times at once more efficiently may override this.
+
+        Parameters
+        ----------
+        origins
+            sequence of origin coordinates
+        destinations
+            sequence of destination coordinates, as long as `origins`
+
+        Returns
+        -------
+        t
+            list of travel times
+        """
+        return [self.t(u, v) for u, v in zip(origins, destinations)]
+
     @abstractmethod
     def random_point(self):
         """
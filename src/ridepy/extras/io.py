@@ -11,6 +11,7 @@ from typing import Iterable
 from pathlib import Path
 
 from ridepy.data_structures import TransportSpace, DistanceDistribution
+from ridepy.util import make_dict
 from ridepy.util.spaces_cython import TransportSpace as CyTransportSpace
 
 
@@ -136,7 +137,7 @@ class EventsJSONEncoder(json.JSONEncoder):
 
     def default(self, obj):
         if dataclasses.is_dataclass(obj):
-            return {"event_type": obj.__class__.__name__} | dataclasses.asdict(obj)
+            return {"event_type": obj.__class__.__name__} | make_dict(obj)
         else:
             return json.JSONEncoder.default(self, obj)
 
@@ -1,3 +1,4 @@
+import numpy as np
 import networkx as nx
 from typing import Tuple
 
@@ -29,14 +30,57 @@ def make_nx_grid(
     -------
     graph
     """
-    graph = nx.grid_graph(dim=dim, periodic=periodic)
-    nx.set_edge_attributes(graph, edge_distance, "distance")
-    graph = nx.relabel.convert_node_labels_to_integers(
-        graph, label_attribute="location"
+    # The vertex with location (row, col) is labeled row * n_cols + col. The edge
+    # arrays are constructed directly instead of building a graph with tuple labels
+    # and relabeling it, but reproduce the vertex and adjacency order of
+    # `nx.grid_graph` followed by `nx.convert_node_labels_to_integers`.
+    n_cols, n_rows = dim
+    idx = np.arange(n_rows * n_cols).reshape(n_rows, n_cols)
+
+    # (source, target) pairs of the edges to the next row, the periodic edges from
+    # the first to the last row, the edges to the next column, and the periodic edges
+    # from the first to the last column, in this order
+    edge_kinds = [(idx[:-1, :], idx[1:, :]), (), (idx[:, :-1], idx[:, 1:]), ()]
+    if periodic:
+        edge_kinds[1] = _periodic_boundary_edges(idx[0, :], idx[-1, :], n_rows)
+        edge_kinds[3] = _periodic_boundary_edges(idx[:, 0], idx[:, -1], n_cols)
+
+    sources = []
+    targets = []
+    kinds = []
+    for kind, edges in enumerate(edge_kinds):
+        if edges:
+            source, target = edges
+            sources.append(source.ravel())
+            targets.append(target.ravel())
+            kinds.append(np.full(source.size, kind))
+
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    order = np.lexsort((np.concatenate(kinds), sources))
+
+    graph = nx.Graph()
+    graph.add_nodes_from(
+        (node, {"location": divmod(node, n_cols)}) for node in range(idx.size)
+    )
+    graph.add_edges_from(
+        zip(sources[order].tolist(), targets[order].tolist()),
+        distance=edge_distance,
     )
     return graph
 
 
+def _periodic_boundary_edges(first, last, size):
+    # Periodic boundaries along a dimension of size 1 are self-loops, along a
+    # dimension of size 2 they coincide with the regular edges.
+    if size == 1:
+        return first, first
+    elif size == 2:
+        return ()
+    else:
+        return first, last
+
+
 def make_nx_cycle_graph(order: int = 10, edge_distance: float = 1) -> nx.Graph:
     """
     Return a cyclic `nx.Graph`
@@ -59,8 +103,12 @@ def make_nx_cycle_graph(order: int = 10, edge_distance: float = 1) -> nx.Graph:
     -------
     graph
     """
-    graph = nx.generators.classic.cycle_graph(n=order)
-    nx.set_edge_attributes(graph, edge_distance, "distance")
+    nodes = np.arange(order)
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes.tolist())
+    graph.add_edges_from(
+        zip(nodes.tolist(), np.roll(nodes, -1).tolist()), distance=edge_distance
+    )
     return graph
 
 
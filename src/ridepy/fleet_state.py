@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from collections import defaultdict
 
-import functools as ft
 import itertools as it
 import operator as op
 
 import numpy as np
 
+from math import inf
+
 
 from abc import ABC, abstractmethod
 from typing import (
@@ -159,7 +160,7 @@ class FleetState(ABC):
                         estimated_arrival_time=0,
                         occupancy_after_servicing=0,
                         time_window_min=0,
-                        time_window_max=np.inf,
+                        time_window_max=inf,
                     )
                 ],
                 space=space,
@@ -245,7 +246,7 @@ class FleetState(ABC):
         return self
 
     def simulate(
-        self, requests: Iterator[Request], t_cutoff: float = np.inf
+        self, requests: Iterator[Request], t_cutoff: float = inf
     ) -> Iterator[Event]:
         """
         Run a simulation.
@@ -424,7 +425,7 @@ class FleetState(ABC):
             ),
         ) = min(all_solutions, key=op.itemgetter(1))
         logger.debug(f"best vehicle: {best_vehicle}, at min_cost={min_cost}")
-        if min_cost == np.inf:  # no solution was found
+        if min_cost == inf:  # no solution was found
             return {
                 "event_type": "RequestRejectionEvent",
                 "timestamp": self.t,
@@ -470,14 +471,15 @@ class SlowSimpleFleetState(FleetState):
                 "request_id": req.request_id,
             }
 
+        # The vehicles are evaluated one after the other in this process. Their
+        # solutions are independent of each other, but the dispatchers hold the
+        # GIL, so there is nothing to gain from threads here. Parallelism is
+        # instead exploited across whole simulations, see `.SimulationSet`.
         return self._apply_request_solution(
             req,
-            map(
-                ft.partial(
-                    self.vehicle_state_class.handle_transportation_request_single_vehicle,
-                    request=req,
-                ),
-                self.fleet.values(),
+            (
+                vehicle_state.handle_transportation_request_single_vehicle(req)
+                for vehicle_state in self.fleet.values()
             ),
         )
 
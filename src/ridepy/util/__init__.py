@@ -10,10 +10,11 @@ import warnings
 from contextlib import contextmanager
 
 import numpy as np
+import itertools as it
+import operator as op
 import dataclasses
 
-from typing import Dict
-
+from typing import Dict, Tuple, Callable
 
 MAX_SEAT_CAPACITY = sys.maxsize  # A very large int, because np.inf is a float
 
@@ -30,6 +31,29 @@ def get_datetime_yymmddHHSS():
     return datetime.datetime.now().strftime("%y%m%d%H%M")
 
 
+_COORDINATE_COMPONENT_TYPES = (int, float, np.integer, np.floating)
+
+
+def _are_single_coordinates(args: Tuple, n_dim: int) -> bool:
+    """
+    Cheaply determine whether all of `args` are single coordinates of an
+    `n_dim`-dimensional space, i.e. numbers (for `n_dim == 1`) or tuples of
+    `n_dim` numbers. Returns False if any of them is something else, including
+    other kinds of single coordinates such as lists or arrays.
+    """
+    for x in args:
+        if n_dim == 1:
+            if not isinstance(x, _COORDINATE_COMPONENT_TYPES):
+                return False
+        elif type(x) is not tuple or len(x) != n_dim:
+            return False
+        else:
+            for component in x:
+                if not isinstance(component, _COORDINATE_COMPONENT_TYPES):
+                    return False
+    return True
+
+
 class smartVectorize:
     """
     Method decorator for TransportSpace and its subclasses.
@@ -70,26 +94,31 @@ class smartVectorize:
         return self
 
     def __call__(self, *args, **kwargs):
+        # Fast path: calls with single coordinates of the common types (numbers
+        # for one-dimensional spaces, tuples of numbers otherwise) are by far the
+        # most frequent ones, e.g. from the dispatchers. Recognizing them by their
+        # type is much cheaper than determining the shapes using numpy below.
+        if not kwargs and _are_single_coordinates(args, self.self_.n_dim):
+            return self.base_fn(self.self_, *args)
+
         # When the decorated method is called, check the following things:
         # 1) If multiple args or kwargs or both are supplied, the shapes of the
-        #    data supplied shall match. This may be up for debate, as hypothetically
-        #    it could e.g. be useful to be able to supply both "vectors", i.e. coordinates,
-        #    *and* scalars. Currently this is not implemented, though.
-
-        shape = None
-
-        # check homogenous shape for all positional arguments
-        if args:
-            shape = np.shape(args[0])
-            if not all(np.shape(arg) == shape for arg in args[1:]):
-                raise ValueError("vector shapes must match")
-
-        # check homogenous shape for all keyword arguments and, if applicable,
-        # make sure they also match the positional arguments' ones
-        if kwargs:
-            if shape is None:
-                shape = np.shape(list(kwargs.values())[0])
-            if not all(np.shape(v) == shape for v in kwargs.values()):
+        #    data supplied shall match. As an exception, single coordinates may
+        #    be supplied together with "vectors", i.e. bunches of coordinates.
+        #    The single coordinates are then broadcast, i.e. paired with each
+        #    of the coordinates in the bunches.
+
+        arg_shapes = [np.shape(arg) for arg in args]
+        kwarg_shapes = {k: np.shape(v) for k, v in kwargs.items()}
+        shapes = [*arg_shapes, *kwarg_shapes.values()]
+
+        shape = shapes[0]
+        broadcast = not all(s == shape for s in shapes[1:])
+        if broadcast:
+            shape = max(shapes, key=len)
+            if len(shape) != self.self_.n_dim or not all(
+                s == shape or s == shape[1:] for s in shapes
+            ):
                 raise ValueError("vector shapes must match")
 
         # 2) now determine whether we are dealing with a single coordinate per
@@ -109,6 +138,17 @@ class smartVectorize:
         elif len(shape) == self.self_.n_dim:
             # if there is no dedicated vectorized version, we need to use a for-loop
             if self.vectorized_fn is None:
+                # repeat single coordinates to be broadcast for each iteration
+                if broadcast:
+                    args = tuple(
+                        arg if arg_shape == shape else it.repeat(arg, shape[0])
+                        for arg, arg_shape in zip(args, arg_shapes)
+                    )
+                    kwargs = {
+                        k: v if kwarg_shapes[k] == shape else it.repeat(v, shape[0])
+                        for k, v in kwargs.items()
+                    }
+
                 # in case we have only positional arguments, this is easy:
                 if args and not kwargs:
                     res = [self.base_fn(self.self_, *arg) for arg in zip(*args)]
@@ -142,7 +182,8 @@ class smartVectorize:
                 return np.array(res)
 
             # ...if however there is a dedicated vectorized function,
-            #    we just forward everything and return
+            #    we just forward everything and return. Single coordinates
+            #    are then broadcast by numpy.
             else:
                 return self.vectorized_fn(self.self_, *args, **kwargs)
 
@@ -164,6 +205,12 @@ class smartVectorize:
 def make_dict(item, raise_errors: bool = True) -> Dict:
     """
     Convert data structure object to dict
+
+    For dataclasses, the field values are read directly instead of going
+    through `dataclasses.asdict`, which deep-copies every value. Like there,
+    nested dataclasses are converted recursively, also inside lists, tuples and
+    dicts. All other values are returned as is.
+
     Parameters
     ----------
     item
@@ -177,13 +224,63 @@ def make_dict(item, raise_errors: bool = True) -> Dict:
 
     """
     if dataclasses.is_dataclass(item):
-        return dataclasses.asdict(item)
+        names, getter = _get_dataclass_field_getter(type(item))
+        return {
+            name: _make_dict_value(value) for name, value in zip(names, getter(item))
+        }
     elif hasattr(item, "asdict"):
         return item.asdict()
     elif raise_errors:
         raise TypeError(f"Cannot convert object of type {type(item)} to dict")
 
 
+# types of field values that never contain dataclasses
+_ATOMIC_TYPES = frozenset({int, float, str, bool, type(None)})
+
+
+def _make_dict_value(value):
+    """
+    Convert a field value of a dataclass for `make_dict`, recursing into
+    dataclasses and containers the same way `dataclasses.asdict` does.
+    """
+    if type(value) in _ATOMIC_TYPES:
+        return value
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return make_dict(value)
+    elif isinstance(value, tuple) and hasattr(value, "_fields"):
+        # namedtuples take their fields as positional arguments
+        return type(value)(*map(_make_dict_value, value))
+    elif isinstance(value, (list, tuple)):
+        return type(value)(map(_make_dict_value, value))
+    elif isinstance(value, dict):
+        return type(value)(
+            (_make_dict_value(k), _make_dict_value(v)) for k, v in value.items()
+        )
+    else:
+        return value
+
+
+_dataclass_field_getters = {}
+
+
+def _get_dataclass_field_getter(cls) -> Tuple[Tuple[str, ...], Callable]:
+    """
+    Return the field names of a dataclass and a callable returning the tuple of
+    the respective values of an instance. Computed once per class.
+    """
+    try:
+        return _dataclass_field_getters[cls]
+    except KeyError:
+        names = tuple(field.name for field in dataclasses.fields(cls))
+        if len(names) > 1:
+            getter = op.attrgetter(*names)
+        else:
+            getter = lambda obj: tuple(getattr(obj, name) for name in names)
+
+        _dataclass_field_getters[cls] = names, getter
+        return names, getter
+
+
 def make_repr(cls, dct):
     return f"{cls}(" + ", ".join((map(lambda s: f"{s[0]}={s[1]!r}", dct.items()))) + ")"
 
@@ -1,5 +1,6 @@
-from typing import Iterable, List
+from typing import Iterable, List, Optional, Collection
 
+import numpy as np
 import pandas as pd
 
 from ridepy.data_structures import TransportSpace
@@ -10,7 +11,11 @@ from ridepy.util.analytics.stops import (
 from ridepy.util.analytics.requests import _create_transportation_requests_dataframe
 
 
-def _create_events_dataframe(events: Iterable[dict]) -> pd.DataFrame:
+def _create_events_dataframe(
+    events: Iterable[dict],
+    event_types: Optional[Collection[str]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
     """
     Create a DataFrame of all logged events with their properties at columns.
 
@@ -36,16 +41,53 @@ def _create_events_dataframe(events: Iterable[dict]) -> pd.DataFrame:
     Parameters
     ----------
     events
+    event_types
+        If given, only include events of these types.
+    columns
+        If given, only create these columns. Missing properties are filled with nan.
 
     Returns
     -------
     events DataFrame, indexed by integer range
     """
-    return pd.DataFrame(events)
+    if event_types is not None:
+        events = [event for event in events if event["event_type"] in event_types]
+
+    return pd.DataFrame(events, columns=columns)
+
+
+def _downcast_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast the numeric columns of a DataFrame in place to the smallest dtypes
+    that hold their values without loss, e.g. float64 to float32 and int64 to int8.
+    Non-numeric columns, such as locations, are left untouched.
+
+    Parameters
+    ----------
+    df
+        DataFrame to downcast
+
+    Returns
+    -------
+    the downcast DataFrame
+    """
+    for column, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            continue
+        elif pd.api.types.is_integer_dtype(dtype):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+        elif pd.api.types.is_float_dtype(dtype):
+            # `pd.to_numeric` would downcast to single precision whenever the
+            # values round-trip within a tolerance. Only do so if that is exact.
+            single_precision_column = df[column].astype(np.float32)
+            if np.array_equal(single_precision_column, df[column], equal_nan=True):
+                df[column] = single_precision_column
+
+    return df
 
 
 def get_stops_and_requests_from_events_dataframe(
-    *, events_df: pd.DataFrame, space: TransportSpace
+    *, events_df: pd.DataFrame, space: TransportSpace, downcast: bool = False
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Prepare stops and requests dataframes from an events dataframe.
@@ -56,6 +98,9 @@ def get_stops_and_requests_from_events_dataframe(
     events_df
         DataFrame indexed
     space
+    downcast
+        If True, downcast the numeric columns of the returned DataFrames
+        to the smallest dtypes that hold their values without loss.
 
     Returns
     -------
@@ -64,9 +109,29 @@ def get_stops_and_requests_from_events_dataframe(
     requests
         dataframe indexed by `request_id` containing all requests
     """
-    stops_df = _create_stoplist_dataframe(evs=events_df)
+    return _get_stops_and_requests(
+        stop_events_df=events_df,
+        request_events_df=events_df,
+        space=space,
+        downcast=downcast,
+    )
+
+
+def _get_stops_and_requests(
+    *,
+    stop_events_df: pd.DataFrame,
+    request_events_df: pd.DataFrame,
+    space: TransportSpace,
+    downcast: bool,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Prepare stops and requests dataframes from dataframes containing (at least)
+    the stop events and the request events, respectively. These may be the same.
+    For the parameters see `get_stops_and_requests_from_events_dataframe`.
+    """
+    stops_df = _create_stoplist_dataframe(evs=stop_events_df)
     requests_df = _create_transportation_requests_dataframe(
-        evs=events_df, stops=stops_df, space=space
+        evs=request_events_df, stops=stops_df, space=space
     )
 
     # try:
@@ -80,11 +145,15 @@ def get_stops_and_requests_from_events_dataframe(
 
     # pass
 
+    if downcast:
+        _downcast_numeric_columns(stops_df)
+        _downcast_numeric_columns(requests_df)
+
     return stops_df, requests_df
 
 
 def get_stops_and_requests(
-    *, events: List[dict], space: TransportSpace
+    *, events: Iterable[dict], space: TransportSpace, downcast: bool = False
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Prepare two DataFrames, containing stops and requests.
@@ -168,9 +237,15 @@ def get_stops_and_requests(
     Parameters
     ----------
     events
-        list of all the events returned by the simulation
+        all the events returned by the simulation, either as a list or as an
+        iterator such as the one returned by `.FleetState.simulate`
     space
         transportation space that was used for the simulations
+    downcast
+        If True, downcast the numeric columns of the returned DataFrames
+        to the smallest dtypes that hold their values without loss, e.g.
+        float64 to float32 and int64 to int8. This reduces the memory footprint
+        of large simulations. The dtypes then differ from the schemas above.
 
     Returns
     -------
@@ -180,6 +255,43 @@ def get_stops_and_requests(
         dataframe indexed by `request_id` containing all requests
     """
 
-    return get_stops_and_requests_from_events_dataframe(
-        events_df=_create_events_dataframe(events=events), space=space
+    # The events are read twice below, so iterators must be materialized first.
+    events = list(events)
+
+    # Only the request events need the wide schema containing the request properties,
+    # so the stop events are put into a separate, narrow dataframe.
+    stop_events_df = _create_events_dataframe(
+        events=events,
+        event_types={
+            "PickupEvent",
+            "DeliveryEvent",
+            "VehicleStateBeginEvent",
+            "VehicleStateEndEvent",
+        },
+        columns=["event_type", "timestamp", "vehicle_id", "request_id", "location"],
+    )
+    request_events_df = _create_events_dataframe(
+        events=events,
+        event_types={
+            "RequestSubmissionEvent",
+            "RequestAcceptanceEvent",
+            "RequestRejectionEvent",
+        },
+    )
+
+    # In the full events dataframe, all properties except for `timestamp` and `request_id`
+    # are missing for some of the events, which turns integer columns into float64.
+    # Keep the dtypes identical to those obtained from the full events dataframe.
+    for df in [stop_events_df, request_events_df]:
+        for column, dtype in df.dtypes.items():
+            if column in ["timestamp", "request_id"]:
+                continue
+            if pd.api.types.is_integer_dtype(dtype):
+                df[column] = df[column].astype(float)
+
+    return _get_stops_and_requests(
+        stop_events_df=stop_events_df,
+        request_events_df=request_events_df,
+        space=space,
+        downcast=downcast,
     )
@@ -59,22 +59,21 @@ def _create_transportation_requests_dataframe(
 
     # first turn all request submission, acceptance and rejection events into a dataframe
     reqs = (
-        evs[
+        evs.loc[
             evs["event_type"].isin(
                 [
                     "RequestSubmissionEvent",
                     "RequestAcceptanceEvent",
                     "RequestRejectionEvent",
                 ]
-            )
-        ]  # select only request events
-        .drop(["vehicle_id", "location"], axis=1)  # drop now empty columns
-        .set_index(
-            ["request_id", "event_type"]
-        )  # set index to be request_id and event_type
-        .unstack()  # unstack so that remaining index is request_id and column index is MultiIndex event_type as level_1
-        .reorder_levels(
-            [1, 0], axis=1
+            ),
+            evs.columns.drop(["vehicle_id", "location"], errors="ignore"),
+        ]  # select only request events, dropping the now empty columns
+        .pivot(
+            index="request_id", columns="event_type"
+        )  # reshape in one pass so that the index is request_id and the column index is MultiIndex with event_type as level_1
+        .swaplevel(
+            0, 1, axis=1
         )  # switch column index order to have event_type as level_0
         .sort_index(axis=1)  # sort so that columns are grouped by event_type
         .drop(
@@ -62,65 +62,57 @@ def _create_stoplist_dataframe(*, evs: pd.DataFrame) -> pd.DataFrame:
     # ... and drop the event_type as pickup/dropoff is now signified through delta_occupancy
     stops.drop("event_type", axis=1, inplace=True)
 
-    stops.sort_values(["vehicle_id", "timestamp", "request_id"], inplace=True)
-
     # Fix the stop order. The begin and end stops have identical timestamps as
     # other stops, partially on the same vehicle. This is problematic as for
     # proper computation of the state durations BEGIN and END **must** be first
-    # and last stops in every stoplist.
-    def fix_start_stop_order(df):
-        # get absolute current positions of the BEGIN/END stops
-        i_start = (df["request_id"] == -100).argmax()
-        i_stop = (df["request_id"] == -200).argmax()
-
-        # get dataframe's integer index values for the dummy stops
-        idx = df.index.to_list()
-
-        k_start = idx[i_start]
-        k_stop = idx[i_stop]
-
-        # delete the existing stops from the index list...
-        if i_start < i_stop:
-            i_stop -= 1
-        else:
-            i_start -= 1
-
-        del idx[i_start]
-        del idx[i_stop]
-
-        # ...and insert them at the correct positions
-        idx.insert(0, k_start)
-        idx.append(k_stop)
+    # and last stops in every stoplist. Instead of reordering every vehicle's
+    # stops separately, sort once using an additional key that places BEGIN
+    # before and END after all other stops of the respective vehicle.
+    request_ids = stops["request_id"].to_numpy()
+    stop_order = np.ones(len(stops), dtype=np.int8)
+    stop_order[request_ids == -100] = 0
+    stop_order[request_ids == -200] = 2
+    stops["stop_order"] = stop_order
+    stops.sort_values(
+        ["vehicle_id", "stop_order", "timestamp", "request_id"], inplace=True
+    )
+    stops.drop("stop_order", axis=1, inplace=True)
 
-        return df.loc[idx]
+    # From here on, all per-vehicle quantities are computed in one pass over the
+    # raw arrays, using the fact that the stops of each vehicle are contiguous.
+    vehicle_ids = stops["vehicle_id"].to_numpy()
+    timestamps = stops["timestamp"].to_numpy(dtype=float)
+    delta_occupancies = stops["delta_occupancy"].to_numpy(dtype=float)
 
-    stops = stops.groupby("vehicle_id", as_index=False, group_keys=False).apply(
-        fix_start_stop_order
-    )
+    n_stops = len(stops)
+    is_group_start = np.ones(n_stops, dtype=bool)
+    is_group_start[1:] = vehicle_ids[1:] != vehicle_ids[:-1]
+    group_start_idx = np.flatnonzero(is_group_start)
+    group_sizes = np.diff(np.append(group_start_idx, n_stops))
 
     # compute the durations of every state and add them as a columns to the dataframe
-    stops["state_duration"] = (
-        stops.groupby("vehicle_id")["timestamp"].diff().shift(-1).fillna(0)
-    )
+    state_durations = np.zeros(n_stops)
+    state_durations[:-1] = timestamps[1:] - timestamps[:-1]
+    state_durations[np.flatnonzero(np.append(is_group_start[1:], True))] = 0
+    stops["state_duration"] = state_durations
+
     # compute the occupancy as delta_occupancy cumsum
-    stops["occupancy"] = stops.groupby("vehicle_id")["delta_occupancy"].cumsum()
+    occupancies = np.cumsum(delta_occupancies)
+    occupancies -= np.repeat(occupancies[group_start_idx], group_sizes)
+    occupancies += np.repeat(delta_occupancies[group_start_idx], group_sizes)
+    stops["occupancy"] = occupancies
 
     # set index to ('vehicle_id, 'stop_id'), where stop_id in 0...N for each vehicle
-    stops = (
-        stops.groupby("vehicle_id")
-        .apply(lambda df: df.reset_index(drop=True))
-        .drop("vehicle_id", axis=1)
+    stops.index = pd.MultiIndex.from_arrays(
+        [vehicle_ids, np.arange(n_stops) - np.repeat(group_start_idx, group_sizes)],
+        names=["vehicle_id", "stop_id"],
     )
-    stops.index.rename(names="stop_id", level=1, inplace=True)
+    stops.drop("vehicle_id", axis=1, inplace=True)
 
     # check total operational times of all vehicles are almost identical
-    iterator = iter(stops.groupby("vehicle_id")["state_duration"].sum())
-    try:
-        first = next(iterator)
-    except StopIteration:
-        pass
-    else:
-        assert all(np.isclose(first, x) for x in iterator)
+    if n_stops:
+        operational_times = np.add.reduceat(state_durations, group_start_idx)
+        assert np.allclose(operational_times[0], operational_times)
 
     return stops
 
@@ -159,49 +151,48 @@ def _add_locations_to_stoplist_dataframe(*, reqs, stops, space) -> pd.DataFrame:
     stoplist DataFrame with added stop locations indexed by `vehicle_id` and `timestamp`
     """
 
-    # use the requests' locations and reshape them into a DateFrame indexed by
-    # `request_id` and `delta_occupancy`
-    if "accepted" in reqs.columns:
-        locations = reqs.loc[:, ("accepted", ["origin", "destination"])]
-    else:
-        locations = pd.DataFrame(
-            index=reqs.index,
-            columns=pd.MultiIndex.from_product(
-                [["accepted"], ["origin", "destination"]]
-            ),
-        )
-    locations.columns = locations.columns.droplevel(0).rename("delta_occupancy")
-    locations = locations.stack().rename("location")
-
+    # finally fill the locations missing in the stops dataframe by gathering the
+    # accepted requests' origins (for pickups) and destinations (for dropoffs)
     # NOTE: This assumes occupancy delta of +1/-1, i.e. only single-customer requests.
     #       If the simulator should allow for multi-customer requests in the future,
     #       this must be changed.
     #       See also [issue #45](https://github.com/PhysicsOfMobility/ridepy/issues/45)
-    locations.index = locations.index.set_levels(
-        levels=locations.index.levels[1].map({"origin": 1.0, "destination": -1.0}),
-        level=1,
-    )
-
-    # finally fill the locations missing in the stops dataframe by joining on request_id and delta_occupancy
-    # and subsequently filling up nan from the now index-aligned "location_tmp" series
-    stops["location"] = stops["location"].fillna(
-        stops.join(locations, on=["request_id", "delta_occupancy"], rsuffix="_tmp")[
-            "location_tmp"
-        ],
-    )
-
-    def dist_time_to_next(df):
-        locs = df["location"]
+    if "accepted" in reqs.columns:
+        # position of each stop's request in the requests dataframe, -1 for internal stops
+        request_idx = reqs.index.get_indexer(stops["request_id"])
+        is_request_stop = request_idx >= 0
+        request_idx = np.where(is_request_stop, request_idx, 0)
+
+        origins = reqs[("accepted", "origin")].to_numpy().take(request_idx)
+        destinations = reqs[("accepted", "destination")].to_numpy().take(request_idx)
+        is_pickup = stops["delta_occupancy"].to_numpy() > 0
+
+        stops["location"] = stops["location"].fillna(
+            pd.Series(
+                np.where(
+                    is_request_stop,
+                    np.where(is_pickup, origins, destinations),
+                    np.nan,
+                ),
+                index=stops.index,
+            ),
+        )
 
-        dist_to_next = space.d(locs[:-1].to_list(), locs[1:].to_list())
-        df["dist_to_next"] = pd.Series(dist_to_next, index=df.index[:-1])
+    # compute distance and time to the next stop of the same vehicle for all stops at once,
+    # discarding the values computed across the boundaries between the vehicles' stoplists
+    dist_to_next = np.full(len(stops), np.nan)
+    time_to_next = np.full(len(stops), np.nan)
 
-        time_to_next = space.t(locs[:-1].to_list(), locs[1:].to_list())
-        df["time_to_next"] = pd.Series(time_to_next, index=df.index[:-1])
+    if len(stops) > 1:
+        vehicle_ids = stops.index.get_level_values("vehicle_id").to_numpy()
+        has_next = vehicle_ids[1:] == vehicle_ids[:-1]
+        locs = stops["location"].to_list()
 
-        return df
+        dist_to_next[:-1] = np.where(has_next, space.d(locs[:-1], locs[1:]), np.nan)
+        time_to_next[:-1] = np.where(has_next, space.t(locs[:-1], locs[1:]), np.nan)
 
-    stops = stops.groupby("vehicle_id", group_keys=False).apply(dist_time_to_next)
+    stops["dist_to_next"] = dist_to_next
+    stops["time_to_next"] = time_to_next
 
     return stops[
         [
@@ -217,6 +208,125 @@ def _add_locations_to_stoplist_dataframe(*, reqs, stops, space) -> pd.DataFrame:
     ]
 
 
+def _first_index_of_request(_sl, stop):
+    # compare on the bare array, avoiding the construction of a boolean Series
+    return (_sl["request_id"].to_numpy() == stop["request_id"]).argmax()
+
+
+def _last_index_of_request(_sl, stop):
+    return (
+        len(_sl)
+        - (_sl["request_id"].to_numpy()[::-1] == stop["request_id"]).argmax()
+        - 1
+    )
+
+
+def _get_legs(i_stop, _sl, stop, time_desc, space):
+    l_sl = len(_sl)
+    # read the neighbouring stops' locations once, instead of materializing
+    # their whole rows for every leg they are part of
+    locations = _sl["location"]
+    if i_stop == 0 == l_sl - 1:
+        stop_leg_1 = 0
+        stop_leg_2 = 0
+        stop_leg_d = 0
+    elif i_stop == 0:
+        stop_leg_1 = 0
+        stop_leg_2 = space.d(stop["location"], locations.iat[i_stop + 1])
+        stop_leg_d = stop_leg_1
+    elif i_stop == l_sl - 1:
+        stop_leg_1 = space.d(locations.iat[i_stop - 1], stop["location"])
+        stop_leg_2 = 0
+        stop_leg_d = stop_leg_2
+    else:
+        previous_location = locations.iat[i_stop - 1]
+        next_location = locations.iat[i_stop + 1]
+        stop_leg_1 = space.d(previous_location, stop["location"])
+        stop_leg_2 = space.d(stop["location"], next_location)
+        stop_leg_d = space.d(previous_location, next_location)
+
+    stop_detour = stop_leg_1 + stop_leg_2 - stop_leg_d
+
+    return {
+        f"leg_1_dist_{time_desc}_time": stop_leg_1,
+        f"leg_2_dist_{time_desc}_time": stop_leg_2,
+        f"leg_direct_dist_{time_desc}_time": stop_leg_d,
+        f"detour_dist_{time_desc}_time": stop_detour,
+    }
+
+
+def _properties_at_time(stop, full_sl, scope, space):
+    t = stop["timestamp"]
+    ts = stop["timestamp_submitted"]
+    pu = True if stop["delta_occupancy"] > 0 else False
+
+    sl = full_sl[(full_sl["timestamp_submitted"] <= t) & (t <= full_sl["timestamp"])]
+
+    sl_s = full_sl[
+        (full_sl["timestamp_submitted"] <= ts) & (ts <= full_sl["timestamp"])
+    ]
+
+    if pu:
+        i_pu_sl = _first_index_of_request(sl, stop)
+        i_pu_sl_s = _first_index_of_request(sl_s, stop)
+        i_do_sl_s = _last_index_of_request(sl_s, stop)
+
+        idx_pu = sl_s.iloc[i_pu_sl_s].name
+        idx_do = sl_s.iloc[i_do_sl_s].name
+        assert idx_pu == stop.name
+
+        i_stop_sl = i_pu_sl
+        i_stop_sl_s = i_pu_sl_s
+    else:
+        i_do_sl = _last_index_of_request(sl, stop)
+
+        i_pu_sl_s = _first_index_of_request(sl_s, stop)
+        i_do_sl_s = _last_index_of_request(sl_s, stop)
+
+        idx_pu = sl_s.iloc[i_pu_sl_s].name
+        idx_do = sl_s.iloc[i_do_sl_s].name
+        assert idx_do == stop.name
+
+        i_stop_sl = i_do_sl
+        i_stop_sl_s = i_do_sl_s
+
+    res = {}
+
+    if scope != "system":
+        res["insertion_index"] = len(sl_s[sl_s["timestamp"] < t])
+
+        res |= _get_legs(i_stop_sl, sl, stop, "service", space)
+        res |= _get_legs(i_stop_sl_s, sl_s, stop, "submission", space)
+
+    if pu:
+        sl.drop([idx_pu, idx_do], inplace=True)
+        sl_s.drop([idx_pu, idx_do], inplace=True)
+    else:
+        sl.drop(idx_do, inplace=True)
+        sl_s.drop([idx_pu, idx_do], inplace=True)
+
+    res[f"{'system_' if scope=='system' else ''}stoplist_length_submission_time"] = len(
+        sl_s
+    )
+    res[f"{'system_' if scope=='system' else ''}stoplist_length_service_time"] = len(sl)
+
+    res[f"avg_{'system_' if scope=='system' else ''}segment_dist_submission_time"] = (
+        sl_s["dist_to_next"].mean()
+    )
+    res[f"avg_{'system_' if scope=='system' else ''}segment_time_submission_time"] = (
+        sl_s["time_to_next"].mean()
+    )
+
+    res[f"avg_{'system_' if scope=='system' else ''}segment_dist_service_time"] = sl[
+        "dist_to_next"
+    ].mean()
+    res[f"avg_{'system_' if scope=='system' else ''}segment_time_service_time"] = sl[
+        "time_to_next"
+    ].mean()
+
+    return res
+
+
 def _add_insertion_stats_to_stoplist_dataframe(*, reqs, stops, space) -> pd.DataFrame:
     """
 
@@ -285,131 +395,12 @@ def _add_insertion_stats_to_stoplist_dataframe(*, reqs, stops, space) -> pd.Data
     )
     actual_stops = stops.dropna(subset=("timestamp_submitted",))
 
-    def _properties_at_time(stop, full_sl, scope):
-        t = stop["timestamp"]
-        ts = stop["timestamp_submitted"]
-        pu = True if stop["delta_occupancy"] > 0 else False
-
-        get_i_pu = lambda _sl, stop: (_sl["request_id"] == stop["request_id"]).argmax()
-        get_i_do = (
-            lambda _sl, stop: len(_sl)
-            - (_sl["request_id"] == stop["request_id"])[::-1].argmax()
-            - 1
-        )
-
-        sl = full_sl[
-            (full_sl["timestamp_submitted"] <= t) & (t <= full_sl["timestamp"])
-        ]
-
-        sl_s = full_sl[
-            (full_sl["timestamp_submitted"] <= ts) & (ts <= full_sl["timestamp"])
-        ]
-
-        if pu:
-            i_pu_sl = get_i_pu(sl, stop)
-            i_pu_sl_s = get_i_pu(sl_s, stop)
-            i_do_sl_s = get_i_do(sl_s, stop)
-
-            idx_pu = sl_s.iloc[i_pu_sl_s].name
-            idx_do = sl_s.iloc[i_do_sl_s].name
-            assert idx_pu == stop.name
-
-            i_stop_sl = i_pu_sl
-            i_stop_sl_s = i_pu_sl_s
-        else:
-            i_do_sl = get_i_do(sl, stop)
-
-            i_pu_sl_s = get_i_pu(sl_s, stop)
-            i_do_sl_s = get_i_do(sl_s, stop)
-
-            idx_pu = sl_s.iloc[i_pu_sl_s].name
-            idx_do = sl_s.iloc[i_do_sl_s].name
-            assert idx_do == stop.name
-
-            i_stop_sl = i_do_sl
-            i_stop_sl_s = i_do_sl_s
-
-        res = {}
-
-        if scope != "system":
-            res["insertion_index"] = len(sl_s[sl_s["timestamp"] < t])
-
-            def _get_legs(i_stop, _sl, time_desc):
-                l_sl = len(_sl)
-                if i_stop == 0 == l_sl - 1:
-                    stop_leg_1 = 0
-                    stop_leg_2 = 0
-                    stop_leg_d = 0
-                elif i_stop == 0:
-                    stop_leg_1 = 0
-                    stop_leg_2 = space.d(
-                        stop["location"], _sl.iloc[i_stop + 1]["location"]
-                    )
-                    stop_leg_d = stop_leg_1
-                elif i_stop == l_sl - 1:
-                    stop_leg_1 = space.d(
-                        _sl.iloc[i_stop - 1]["location"], stop["location"]
-                    )
-                    stop_leg_2 = 0
-                    stop_leg_d = stop_leg_2
-                else:
-                    stop_leg_1 = space.d(
-                        _sl.iloc[i_stop - 1]["location"], stop["location"]
-                    )
-                    stop_leg_2 = space.d(
-                        stop["location"], _sl.iloc[i_stop + 1]["location"]
-                    )
-                    stop_leg_d = space.d(
-                        _sl.iloc[i_stop - 1]["location"],
-                        _sl.iloc[i_stop + 1]["location"],
-                    )
-
-                stop_detour = stop_leg_1 + stop_leg_2 - stop_leg_d
-
-                return {
-                    f"leg_1_dist_{time_desc}_time": stop_leg_1,
-                    f"leg_2_dist_{time_desc}_time": stop_leg_2,
-                    f"leg_direct_dist_{time_desc}_time": stop_leg_d,
-                    f"detour_dist_{time_desc}_time": stop_detour,
-                }
-
-            res |= _get_legs(i_stop_sl, sl, "service")
-            res |= _get_legs(i_stop_sl_s, sl_s, "submission")
-
-        if pu:
-            sl.drop([idx_pu, idx_do], inplace=True)
-            sl_s.drop([idx_pu, idx_do], inplace=True)
-        else:
-            sl.drop(idx_do, inplace=True)
-            sl_s.drop([idx_pu, idx_do], inplace=True)
-
-        res[
-            f"{'system_' if scope=='system' else ''}stoplist_length_submission_time"
-        ] = len(sl_s)
-        res[f"{'system_' if scope=='system' else ''}stoplist_length_service_time"] = (
-            len(sl)
-        )
-
-        res[
-            f"avg_{'system_' if scope=='system' else ''}segment_dist_submission_time"
-        ] = sl_s["dist_to_next"].mean()
-        res[
-            f"avg_{'system_' if scope=='system' else ''}segment_time_submission_time"
-        ] = sl_s["time_to_next"].mean()
-
-        res[f"avg_{'system_' if scope=='system' else ''}segment_dist_service_time"] = (
-            sl["dist_to_next"].mean()
-        )
-        res[f"avg_{'system_' if scope=='system' else ''}segment_time_service_time"] = (
-            sl["time_to_next"].mean()
-        )
-
-        return res
-
     stops = stops.merge(
         actual_stops.groupby("vehicle_id", group_keys=False).apply(
             lambda df: df.apply(
-                ft.partial(_properties_at_time, full_sl=df, scope="vehicle"),
+                ft.partial(
+                    _properties_at_time, full_sl=df, scope="vehicle", space=space
+                ),
                 axis=1,
                 result_type="expand",
             )
@@ -421,7 +412,7 @@ def _add_insertion_stats_to_stoplist_dataframe(*, reqs, stops, space) -> pd.Data
 
     stops = stops.merge(
         actual_stops.apply(
-            ft.partial(_properties_at_time, full_sl=stops, scope="system"),
+            ft.partial(_properties_at_time, full_sl=stops, scope="system", space=space),
             axis=1,
             result_type="expand",
         ),
@@ -1,4 +1,6 @@
-from copy import deepcopy
+from copy import copy
+from math import inf, nan, ulp
+from typing import Any, List, Optional, Tuple
 
 import numpy as np
 
@@ -29,53 +31,165 @@ def insert_request_to_stoplist_drive_first(
     Inserts a request into  a stoplist. The pickup (dropoff) is inserted after pickup_idx (dropoff_idx).
     The estimated arrival times at all the stops are updated assuming a drive-first strategy.
     """
-    # We don't want to modify stoplist in place. Make a copy.
-    new_stoplist = deepcopy(stoplist)
+    # We don't want to modify stoplist in place. Only the stops after the pickup
+    # are affected by the insertion, so the stops up to and including the one
+    # before the pickup can be shared with the original stoplist, while the
+    # later ones are copied. Shallow copies suffice, as only the stops' arrival
+    # times and occupancies are updated, while their requests and locations are
+    # shared with the original stops.
+    # The new stoplist is assembled right away, and the delays caused by both
+    # inserted stops are then propagated in a single pass over the later stops.
+    # remember, the indices are as follows:
+    # 0,1,...,pickup_idx,(pickup),...,dropoff_idx + 1,(dropoff),dropoff_idx + 3, ...
 
     # Handle the pickup
-    stop_before_pickup = new_stoplist[pickup_idx]
-    cpat_at_pu = stop_before_pickup.estimated_departure_time + space.t(
-        stop_before_pickup.location, request.origin
-    )
+    origin = request.origin
+    stop_before_pickup = stoplist[pickup_idx]
+    time_to_pickup = space.t(stop_before_pickup.location, origin)
     pickup_stop = Stop(
-        location=request.origin,
+        location=origin,
         action=StopAction.pickup,
-        estimated_arrival_time=cpat_at_pu,
+        estimated_arrival_time=cpat_of_inserted_stop(
+            stop_before=stop_before_pickup, time_from_stop_before=time_to_pickup
+        ),
         time_window_min=request.pickup_timewindow_min,
         time_window_max=request.pickup_timewindow_max,
         request=request,
         occupancy_after_servicing=stop_before_pickup.occupancy_after_servicing
         + n_passengers,
     )
-    # increase the occupancies of all the stops between pickup and dropoff
-    # remember, the indices are as follows:
-    # 0,1,...,pickup_idx,(pickup_not_yet_inserted),...,dropoff_idx,(dropoff_not_yet_inserted), ...
-    for s in new_stoplist[pickup_idx + 1 : dropoff_idx + 1]:
-        s.occupancy_after_servicing += n_passengers
 
-    insert_stop_to_stoplist_drive_first(new_stoplist, pickup_stop, pickup_idx, space)
+    stops_between = list(map(copy, stoplist[pickup_idx + 1 : dropoff_idx + 1]))
+    new_stoplist = [
+        *stoplist[: pickup_idx + 1],
+        pickup_stop,
+        *stops_between,
+        None,  # placeholder for the dropoff
+        *map(copy, stoplist[dropoff_idx + 1 :]),
+    ]
+
+    # increase the occupancies of all the stops between pickup and dropoff and
+    # delay them due to the pickup
+    for s in stops_between:
+        s.occupancy_after_servicing += n_passengers
+    if stops_between:
+        _propagate_delay_drive_first(
+            new_stoplist,
+            first_idx=pickup_idx + 2,
+            last_idx=dropoff_idx + 2,
+            delta_cpat=pickup_stop.estimated_departure_time
+            + space.t(origin, stops_between[0].location)
+            - stops_between[0].estimated_arrival_time,
+        )
 
     # Handle the dropoff
-    dropoff_idx += 1
-    stop_before_dropoff = new_stoplist[dropoff_idx]
-    cpat_at_do = stop_before_dropoff.estimated_departure_time + space.t(
-        stop_before_dropoff.location, request.destination
-    )
+    stop_before_dropoff = new_stoplist[dropoff_idx + 1]
+    destination = request.destination
     dropoff_stop = Stop(
-        location=request.destination,
+        location=destination,
         action=StopAction.dropoff,
-        estimated_arrival_time=cpat_at_do,
+        estimated_arrival_time=cpat_of_inserted_stop(
+            stop_before=stop_before_dropoff,
+            time_from_stop_before=space.t(stop_before_dropoff.location, destination),
+        ),
         time_window_min=request.delivery_timewindow_min,
         time_window_max=request.delivery_timewindow_max,
         request=request,
         occupancy_after_servicing=stop_before_dropoff.occupancy_after_servicing
         - n_passengers,
     )
-    insert_stop_to_stoplist_drive_first(new_stoplist, dropoff_stop, dropoff_idx, space)
+    new_stoplist[dropoff_idx + 2] = dropoff_stop
+
+    # Delay the stops after the dropoff. The delay of the first one is computed
+    # w.r.t. its original arrival time, so it accounts for both inserted stops.
+    if dropoff_idx + 3 < len(new_stoplist):
+        stop_after_dropoff = new_stoplist[dropoff_idx + 3]
+        _propagate_delay_drive_first(
+            new_stoplist,
+            first_idx=dropoff_idx + 3,
+            last_idx=len(new_stoplist),
+            delta_cpat=dropoff_stop.estimated_departure_time
+            + space.t(destination, stop_after_dropoff.location)
+            - stop_after_dropoff.estimated_arrival_time,
+        )
 
     return new_stoplist
 
 
+def _update_arrival_times_drive_first(
+    stoplist: Stoplist,
+    stop: Stop,
+    stop_before: Stop,
+    next_idx: int,
+    space: TransportSpace,
+    time_from_stop_before: Optional[float] = None,
+) -> None:
+    """
+    Sets the estimated arrival time of `stop`, which is to be inserted between
+    `stop_before` and ``stoplist[next_idx]``, and delays the stops from `next_idx`
+    onwards accordingly, assuming a drive-first strategy.
+
+    The travel time from `stop_before` to `stop` is queried from `space` unless
+    it is passed as `time_from_stop_before`.
+
+    Note: Modifies the stops in `stoplist`, but does not insert `stop` into it.
+    """
+    if time_from_stop_before is None:
+        time_from_stop_before = space.t(stop_before.location, stop.location)
+    stop.estimated_arrival_time = cpat_of_inserted_stop(
+        stop_before=stop_before,
+        time_from_stop_before=time_from_stop_before,
+    )
+
+    if next_idx < len(stoplist):
+        # update CPATs of later stops
+        next_stop = stoplist[next_idx]
+        _propagate_delay_drive_first(
+            stoplist,
+            first_idx=next_idx,
+            last_idx=len(stoplist),
+            delta_cpat=stop.estimated_departure_time
+            + space.t(stop.location, next_stop.location)
+            - next_stop.estimated_arrival_time,
+        )
+
+
+def _propagate_delay_drive_first(
+    stoplist: Stoplist, first_idx: int, last_idx: int, delta_cpat: float
+) -> float:
+    """
+    Delays the arrival of ``stoplist[first_idx]`` by `delta_cpat` and passes the
+    resulting delay on to the stops up to, but excluding, ``stoplist[last_idx]``,
+    assuming a drive-first strategy. Returns the delay that would be passed on
+    to ``stoplist[last_idx]``.
+
+    Note: Modifies the stops in `stoplist` in place.
+    """
+    # iterate by index rather than over a slice, which would copy the whole
+    # remainder of the stoplist although the loop usually stops early
+    for later_idx in range(first_idx, last_idx):
+        if delta_cpat == 0:
+            break
+        later_stop = stoplist[later_idx]
+        # read each attribute once and compute the old and new departure times
+        # directly, instead of evaluating the `estimated_departure_time`
+        # property before and after updating the arrival time
+        old_arrival = later_stop.estimated_arrival_time
+        time_window_min = later_stop.time_window_min
+        new_arrival = old_arrival + delta_cpat
+        later_stop.estimated_arrival_time = new_arrival
+        if old_arrival >= time_window_min and new_arrival >= time_window_min:
+            # no waiting at this stop, neither before nor after the delay:
+            # the delay is passed on as is, no need for the `max` calls
+            delta_cpat = new_arrival - old_arrival
+        else:
+            delta_cpat = max(new_arrival, time_window_min) - max(
+                old_arrival, time_window_min
+            )
+
+    return delta_cpat
+
+
 def insert_stop_to_stoplist_drive_first(
     stoplist: Stoplist,
     stop: Stop,
@@ -92,28 +206,13 @@ def insert_stop_to_stoplist_drive_first(
 
     Returns:
     """
-    stop_before_insertion = stoplist[idx]
-    stop.estimated_arrival_time = cpat_of_inserted_stop(
-        stop_before=stop_before_insertion,
-        time_from_stop_before=space.t(stop_before_insertion.location, stop.location),
+    _update_arrival_times_drive_first(
+        stoplist=stoplist,
+        stop=stop,
+        stop_before=stoplist[idx],
+        next_idx=idx + 1,
+        space=space,
     )
-
-    if idx < len(stoplist) - 1:
-        # update CPATs of later stops
-        delta_CPAT_next_stop = (
-            stop.estimated_departure_time
-            + space.t(stop.location, stoplist[idx + 1].location)
-            - stoplist[idx + 1].estimated_arrival_time
-        )
-
-        for later_stop in stoplist[idx + 1 :]:
-            old_departure = later_stop.estimated_departure_time
-            later_stop.estimated_arrival_time += delta_CPAT_next_stop
-            delta_CPAT_next_stop = later_stop.estimated_departure_time - old_departure
-
-            if delta_CPAT_next_stop == 0:
-                break
-
     stoplist.insert(idx + 1, stop)
 
 
@@ -179,109 +278,277 @@ def is_timewindow_violated_or_violation_worsened_due_to_insertion(
         return False
 
     # inserted stop incurs zero detour, and we don't have to wait
-    if (
-        est_arrival_first_stop_after_insertion
-        <= stoplist[idx + 1].estimated_arrival_time
-    ):
+    arrival_time_after_insertion = stoplist[idx + 1].estimated_arrival_time
+    if est_arrival_first_stop_after_insertion <= arrival_time_after_insertion:
         return False
 
-    delta_cpat = (
-        est_arrival_first_stop_after_insertion
-        - stoplist[idx + 1].estimated_arrival_time
-    )
+    delta_cpat = est_arrival_first_stop_after_insertion - arrival_time_after_insertion
 
-    for stop in stoplist[idx + 1 :]:
-        old_leeway = stop.time_window_max - stop.estimated_arrival_time
+    # iterate by index rather than over a slice, which would copy the remainder
+    # of the stoplist for every checked insertion
+    for later_idx in range(idx + 1, len(stoplist)):
+        stop = stoplist[later_idx]
+        # read each attribute only once
+        arrival_time = stop.estimated_arrival_time
+        time_window_min = stop.time_window_min
+        old_leeway = stop.time_window_max - arrival_time
         new_leeway = old_leeway - delta_cpat
 
         if new_leeway < 0 and new_leeway < old_leeway:
             return True
-        elif stop.time_window_min >= stop.estimated_arrival_time + delta_cpat:
+
+        delayed_arrival_time = arrival_time + delta_cpat
+        if time_window_min >= delayed_arrival_time:
             # We have to wait or arrive just on time, thus no need to check next stops
             return False
         else:
-            # Otherwise we are incurring additional delay. Compute the remaining delay:
-            delta_cpat = (
-                max(stop.time_window_min, stop.estimated_arrival_time + delta_cpat)
-                - stop.estimated_departure_time
-            )
+            # Otherwise we are incurring additional delay. Compute the remaining
+            # delay. As the delayed arrival is past the time window's start, it is
+            # also the delayed departure.
+            delta_cpat = delayed_arrival_time - max(arrival_time, time_window_min)
 
     return False
 
 
-@dispatcherclass
-def BruteForceTotalTravelTimeMinimizingDispatcher(
-    request: TransportationRequest,
+def _unpack_stoplist(
     stoplist: Stoplist,
-    space: TransportSpace,
-    seat_capacity: int,
-) -> DispatcherSolution:
+) -> Tuple[List[Any], List[float], List[float], List[float], List[float], List[int]]:
     """
-    Dispatcher that maps a vehicle's stoplist and a request to a new stoplist
-    by minimizing the total driving time.
+    Returns the locations, estimated arrival times, estimated departure times,
+    time window minima and maxima, and occupancies of the stops in `stoplist`
+    as separate lists.
+    """
+    locations = [stop.location for stop in stoplist]
+    arrival_times = [stop.estimated_arrival_time for stop in stoplist]
+    time_window_mins = [stop.time_window_min for stop in stoplist]
+    time_window_maxs = [stop.time_window_max for stop in stoplist]
+    occupancies = [stop.occupancy_after_servicing for stop in stoplist]
+    # equivalent to `Stop.estimated_departure_time`, without a property call per stop
+    departure_times = list(map(max, arrival_times, time_window_mins))
 
-    This pure function is turned into a callable class by the decorator `.dispatcherclass` whose __init__ accepts
-    optional arguments, see the docstring of `.dispatcherclass` for details.
+    return (
+        locations,
+        arrival_times,
+        departure_times,
+        time_window_mins,
+        time_window_maxs,
+        occupancies,
+    )
 
-    See the dispatcher interface in :ref:`desc_dispatcher` for details.
 
+def _is_timewindow_violated_or_violation_worsened(
+    arrival_times: List[float],
+    departure_times: List[float],
+    time_window_mins: List[float],
+    time_window_maxs: List[float],
+    min_remaining_leeways: List[float],
+    max_abs_arrival_time: float,
+    idx: int,
+    est_arrival_first_stop_after_insertion: float,
+) -> bool:
+    """
+    Same as `is_timewindow_violated_or_violation_worsened_due_to_insertion`, but
+    operating on the stop attributes as returned by `_unpack_stoplist`.
 
-    Parameters
-    ----------
-    request
-        request to be serviced.
-    stoplist
-        stoplist of the vehicle, to be mapped to a new stoplist.
-    space
-        transport space the vehicle is operating on.
-    seat_capacity
-            the maximum number of `.TransportationRequest` s that can be in a vehicle at the same time.
+    `min_remaining_leeways` holds the suffix minima of the stops' leeways
+    (time window maximum minus estimated arrival time), `max_abs_arrival_time`
+    the largest absolute estimated arrival time in the stoplist.
+    """
+    n_stops = len(arrival_times)
 
-    Returns
-    -------
-        The best solution as defined in `.SingleVehicleSolution`.
+    # we are inserting at the end of the stoplist, nothing to check
+    if idx > n_stops - 2:
+        return False
+
+    # inserted stop incurs zero detour, and we don't have to wait
+    if est_arrival_first_stop_after_insertion <= arrival_times[idx + 1]:
+        return False
+
+    delta_cpat = est_arrival_first_stop_after_insertion - arrival_times[idx + 1]
+
+    # A stop's time window can only be violated if the delay exceeds its leeway.
+    # The delay never grows along the stoplist, except for rounding errors of at
+    # most one ulp per stop. If even the delay plus these errors does not exceed
+    # the smallest leeway of the remaining stops, no time window can be violated
+    # and walking the stoplist is unnecessary.
+    if (
+        delta_cpat + (n_stops - idx) * ulp(2 * (max_abs_arrival_time + delta_cpat))
+        <= min_remaining_leeways[idx + 1]
+    ):
+        return False
+
+    for k in range(idx + 1, n_stops):
+        arrival_time = arrival_times[k]
+        old_leeway = time_window_maxs[k] - arrival_time
+        new_leeway = old_leeway - delta_cpat
+
+        if new_leeway < 0 and new_leeway < old_leeway:
+            return True
+
+        delayed_arrival_time = arrival_time + delta_cpat
+        if time_window_mins[k] >= delayed_arrival_time:
+            # We have to wait or arrive just on time, thus no need to check next stops
+            return False
+        else:
+            # Otherwise we are incurring additional delay. Compute the remaining
+            # delay. As the delayed arrival is past the time window's start, it is
+            # also the delayed departure.
+            delta_cpat = delayed_arrival_time - departure_times[k]
+
+    return False
+
+
+def _find_best_insertion(
+    request: TransportationRequest,
+    stoplist: Stoplist,
+    space: TransportSpace,
+    seat_capacity: int,
+) -> Tuple[float, Optional[Tuple[int, int]]]:
+    """
+    Scans all pickup/dropoff insertion index pairs of `request` into `stoplist`
+    and returns the minimal cost together with the corresponding insertion
+    indices, or ``(inf, None)`` if no feasible insertion exists.
+
+    This is the O(N^2) hot path of `BruteForceTotalTravelTimeMinimizingDispatcher`.
+    It is kept free of any stoplist construction so that it only performs the
+    arithmetic needed for comparing insertions. Ties are broken in favor of the
+    lexicographically smallest index pair, as in the C++ implementation.
     """
-    min_cost = np.inf
-    best_insertion = None
-    for i, stop_before_pickup in enumerate(stoplist):
-        if stop_before_pickup.occupancy_after_servicing == seat_capacity:
+    # Extract the stop attributes needed by the scan once into parallel lists
+    # (struct of arrays) instead of looking them up on the `Stop` objects for
+    # every visited index pair.
+    (
+        locations,
+        arrival_times,
+        departure_times,
+        time_window_mins,
+        time_window_maxs,
+        occupancies,
+    ) = _unpack_stoplist(stoplist)
+    n_stops = len(stoplist)
+
+    # The leeways of the stops, i.e. how much they may be delayed without
+    # violating their time windows, and their suffix minima, which allow to
+    # skip most of the time window checks below.
+    min_remaining_leeways = np.minimum.accumulate(
+        np.subtract(time_window_maxs, arrival_times)[::-1]
+    )[::-1].tolist()
+    max_abs_arrival_time = max(map(abs, arrival_times))
+
+    # Tabulate all travel times the scan needs once per call. The scan visits
+    # O(N^2) index pairs, but only O(N) distinct legs are involved: the legs
+    # from each stop to the request's origin and destination, from those to
+    # the respective next stop, and the existing legs between consecutive
+    # stops. Legs that would start after the last stop have zero length.
+    origins = [request.origin] * n_stops
+    destinations = [request.destination] * n_stops
+    time_to_origin = space.t_many(locations, origins)
+    time_to_destination = space.t_many(locations, destinations)
+    time_from_origin = space.t_many(origins[1:], locations[1:]) + [0]
+    time_from_destination = space.t_many(destinations[1:], locations[1:]) + [0]
+    leg_times = space.t_many(locations[:-1], locations[1:]) + [0]
+
+    # The detour caused by inserting the dropoff after stop j does not depend on
+    # where the pickup has been inserted before. Its suffix minimum is thus a
+    # lower bound on the dropoff cost of all remaining insertions after stop j,
+    # which allows to stop scanning dropoff positions as soon as no improvement
+    # over the best insertion found so far is possible anymore. The trailing
+    # infinity stands for the (empty) set of dropoffs after the last stop.
+    # The pickup and dropoff detours are computed for all stops at once, in a
+    # single pass over the stacked travel times sharing the legs between the
+    # stops. The scan below then only needs to look them up.
+    pickup_costs, dropoff_costs = np.subtract(
+        np.add(
+            (time_to_origin, time_to_destination),
+            (time_from_origin, time_from_destination),
+        ),
+        leg_times,
+    )
+    min_remaining_dropoff_costs = np.minimum.accumulate(dropoff_costs[::-1])[
+        ::-1
+    ].tolist() + [inf]
+    dropoff_costs = dropoff_costs.tolist()
+
+    # bind the request's time windows to local names, they are read in every
+    # iteration of the scan
+    EAST_pu = request.pickup_timewindow_min
+    LAST_pu = request.pickup_timewindow_max
+    EAST_do = request.delivery_timewindow_min
+    LAST_do = request.delivery_timewindow_max
+    last_idx = n_stops - 1
+    time_direct = space.t(request.origin, request.destination)
+
+    # Lower bound on the cost of all insertions with the pickup after stop i:
+    # the cost of the adjacent insertion, evaluated exactly as in the scan, or
+    # the pickup cost plus the cheapest dropoff cost after stop i. The pickups
+    # are visited in ascending order of this bound (branch and bound), so that
+    # cheap insertions are found early and the scan can stop as soon as the
+    # bound of the next pickup exceeds the best cost found. The stable sort
+    # visits pickups of equal bound in index order, which together with the
+    # tie-breaking below keeps the result identical to an in-order scan.
+    adjacent_costs = np.subtract(
+        np.add(np.add(time_to_origin, time_direct), time_from_destination),
+        leg_times,
+    )
+    pickup_lower_bounds = np.minimum(
+        adjacent_costs, pickup_costs + min_remaining_dropoff_costs[1:]
+    )
+    pickup_order = np.argsort(pickup_lower_bounds, kind="stable").tolist()
+    pickup_lower_bounds = pickup_lower_bounds.tolist()
+    pickup_costs = pickup_costs.tolist()
+
+    # Insertions are compared by their cost first and by their index pair second.
+    # The sentinel index pair compares greater than all actual insertions.
+    min_cost = inf
+    best_insertion = n_stops, n_stops
+    for i in pickup_order:
+        lower_bound = pickup_lower_bounds[i]
+        if lower_bound > min_cost or (
+            lower_bound == min_cost and i > best_insertion[0]
+        ):
+            # Neither this nor any of the remaining pickups can yield a better
+            # insertion, as they are visited in ascending order of their bound.
+            break
+        if occupancies[i] == seat_capacity:
             # inserting here will violate capacity constraint
             continue
-        time_to_pickup = space.t(stop_before_pickup.location, request.origin)
-        CPAT_pu = cpat_of_inserted_stop(stop_before_pickup, time_to_pickup)
+        time_to_pickup = time_to_origin[i]
+        CPAT_pu = departure_times[i] + time_to_pickup
         # check for request's pickup timewindow violation
-        if CPAT_pu > request.pickup_timewindow_max:
+        if CPAT_pu > LAST_pu:
             continue
-        EAST_pu = request.pickup_timewindow_min
 
         ######################
         # ADJACENT INSERTION #
         ######################
-        CPAT_do = max(EAST_pu, CPAT_pu) + space.t(request.origin, request.destination)
+        CPAT_do = max(EAST_pu, CPAT_pu) + time_direct
         # check for request's dropoff timewindow violation
-        if CPAT_do > request.delivery_timewindow_max:
+        if CPAT_do > LAST_do:
             continue
 
         # compute the cost function
-        time_to_dropoff = space.t(request.origin, request.destination)
-        time_from_dropoff = time_to_stop_after_insertion(
-            stoplist, request.destination, i, space
-        )
-
-        original_pickup_edge_length = time_from_current_stop_to_next(stoplist, i, space)
+        time_from_dropoff = time_from_destination[i]
+        original_pickup_edge_length = leg_times[i]
         total_cost = (
             time_to_pickup
-            + time_to_dropoff
+            + time_direct
             + time_from_dropoff
             - original_pickup_edge_length
         )
-        if total_cost < min_cost:
+        if total_cost < min_cost or (
+            total_cost == min_cost and (i, i) < best_insertion
+        ):
             # check for constraint violations at later points
-            cpat_at_next_stop = (
-                max(CPAT_do, request.delivery_timewindow_min) + time_from_dropoff
-            )
-            if not is_timewindow_violated_or_violation_worsened_due_to_insertion(
-                stoplist, i, cpat_at_next_stop
+            cpat_at_next_stop = max(CPAT_do, EAST_do) + time_from_dropoff
+            if not _is_timewindow_violated_or_violation_worsened(
+                arrival_times,
+                departure_times,
+                time_window_mins,
+                time_window_maxs,
+                min_remaining_leeways,
+                max_abs_arrival_time,
+                i,
+                cpat_at_next_stop,
             ):
                 best_insertion = i, i
                 min_cost = total_cost
@@ -289,58 +556,71 @@ def BruteForceTotalTravelTimeMinimizingDispatcher(
         ##########################
         # NON-ADJACENT INSERTION #
         ##########################
-        time_from_pickup = time_to_stop_after_insertion(
-            stoplist, request.origin, i, space
-        )
-        cpat_at_next_stop = (
-            max(CPAT_pu, request.pickup_timewindow_min) + time_from_pickup
-        )
-        if is_timewindow_violated_or_violation_worsened_due_to_insertion(
-            stoplist, i, cpat_at_next_stop
+        time_from_pickup = time_from_origin[i]
+        pickup_cost = pickup_costs[i]
+        lower_bound = pickup_cost + min_remaining_dropoff_costs[i + 1]
+        if lower_bound > min_cost or (
+            lower_bound == min_cost and (i, i + 1) > best_insertion
         ):
+            # No dropoff insertion after this pickup can be better. Checking the
+            # cost first spares us walking the stoplist for time window violations.
             continue
 
-        pickup_cost = time_to_pickup + time_from_pickup - original_pickup_edge_length
+        cpat_at_next_stop = max(CPAT_pu, EAST_pu) + time_from_pickup
+        if _is_timewindow_violated_or_violation_worsened(
+            arrival_times,
+            departure_times,
+            time_window_mins,
+            time_window_maxs,
+            min_remaining_leeways,
+            max_abs_arrival_time,
+            i,
+            cpat_at_next_stop,
+        ):
+            continue
 
-        if i < len(stoplist) - 1:
-            delta_cpat = cpat_at_next_stop - stoplist[i + 1].estimated_arrival_time
+        if i < last_idx:
+            delta_cpat = cpat_at_next_stop - arrival_times[i + 1]
 
-        for j, stop_before_dropoff in enumerate(stoplist[i + 1 :], start=i + 1):
+        for j in range(i + 1, n_stops):
             # Need to check for seat capacity constraints. Note the loop: the constraint was not violated after
             # servicing the previous stop (otherwise we wouldn't've reached this line). Need to check that the
             # constraint is not violated due to the action at this stop (stop_before_dropoff)
-            if stop_before_dropoff.occupancy_after_servicing == seat_capacity:
+            if occupancies[j] == seat_capacity:
                 # Capacity is violated. We need to break off this loop because no insertion either here or at a later
                 # stop is permitted
                 break
-            time_to_dropoff = space.t(stop_before_dropoff.location, request.destination)
-            CPAT_do = cpat_of_inserted_stop(
-                stop_before_dropoff,
-                time_to_dropoff,
-                delta_cpat=delta_cpat,
-            )
+            lower_bound = pickup_cost + min_remaining_dropoff_costs[j]
+            if lower_bound > min_cost or (
+                lower_bound == min_cost and (i, j) > best_insertion
+            ):
+                # no dropoff insertion at this or any later stop can be better
+                break
+            time_to_dropoff = time_to_destination[j]
+            # departure at the stop before the dropoff, taking the delay into account
+            new_departure_time = max(arrival_times[j] + delta_cpat, time_window_mins[j])
+            CPAT_do = new_departure_time + time_to_dropoff
             # check for request's dropoff timewindow violation
-            if CPAT_do > request.delivery_timewindow_max:
+            if CPAT_do > LAST_do:
                 break
 
-            time_from_dropoff = time_to_stop_after_insertion(
-                stoplist, request.destination, j, space
-            )
-            original_dropoff_edge_length = time_from_current_stop_to_next(
-                stoplist, j, space
-            )
-            dropoff_cost = (
-                time_to_dropoff + time_from_dropoff - original_dropoff_edge_length
-            )
-            total_cost = pickup_cost + dropoff_cost
+            time_from_dropoff = time_from_destination[j]
+            total_cost = pickup_cost + dropoff_costs[j]
 
-            if total_cost < min_cost:
+            if total_cost < min_cost or (
+                total_cost == min_cost and (i, j) < best_insertion
+            ):
                 # cost has decreased. check for constraint violations at later stops
-                cpat_at_next_stop = (
-                    max(CPAT_do, request.delivery_timewindow_min) + time_from_dropoff
-                )
-                if not is_timewindow_violated_or_violation_worsened_due_to_insertion(
-                    stoplist, j, cpat_at_next_stop
+                cpat_at_next_stop = max(CPAT_do, EAST_do) + time_from_dropoff
+                if not _is_timewindow_violated_or_violation_worsened(
+                    arrival_times,
+                    departure_times,
+                    time_window_mins,
+                    time_window_maxs,
+                    min_remaining_leeways,
+                    max_abs_arrival_time,
+                    j,
+                    cpat_at_next_stop,
                 ):
                     best_insertion = i, j
                     min_cost = total_cost
@@ -348,41 +628,73 @@ def BruteForceTotalTravelTimeMinimizingDispatcher(
             # we will try inserting the dropoff at a later stop
             # the delta_cpat is important to compute correctly for the next stop, it may have changed if
             # we had any slack time at this one
-            new_departure_time = max(
-                stop_before_dropoff.estimated_arrival_time + delta_cpat,
-                stop_before_dropoff.time_window_min,
-            )
-            delta_cpat = (
-                new_departure_time - stop_before_dropoff.estimated_departure_time
-            )
+            delta_cpat = new_departure_time - departure_times[j]
 
-    if min_cost < np.inf:
-        best_pickup_idx, best_dropoff_idx = best_insertion
-        # if request.request_id == 2:
-        # print(f"Py DEBUG: best insertion @ {best_insertion}")
-        # print(stoplist[0].estimated_arrival_time)
-        # print(stoplist[0].location)
-        # print(request.creation_timestamp)
-        # print()
-
-        logger.info(f"Best insertion: {best_insertion}")
-        logger.info(f"Min cost: {min_cost}")
-
-        new_stoplist = insert_request_to_stoplist_drive_first(
-            stoplist=stoplist,
-            request=request,
-            pickup_idx=best_pickup_idx,
-            dropoff_idx=best_dropoff_idx,
-            space=space,
-        )
-        EAST_pu, LAST_pu = (
-            new_stoplist[best_pickup_idx + 1].time_window_min,
-            new_stoplist[best_pickup_idx + 1].time_window_max,
-        )
-        EAST_do, LAST_do = (
-            new_stoplist[best_dropoff_idx + 2].time_window_min,
-            new_stoplist[best_dropoff_idx + 2].time_window_max,
-        )
-        return min_cost, new_stoplist, (EAST_pu, LAST_pu, EAST_do, LAST_do)
-    else:
-        return min_cost, None, (np.nan, np.nan, np.nan, np.nan)
+    if min_cost == inf:
+        return min_cost, None
+    return min_cost, best_insertion
+
+
+@dispatcherclass
+def BruteForceTotalTravelTimeMinimizingDispatcher(
+    request: TransportationRequest,
+    stoplist: Stoplist,
+    space: TransportSpace,
+    seat_capacity: int,
+) -> DispatcherSolution:
+    """
+    Dispatcher that maps a vehicle's stoplist and a request to a new stoplist
+    by minimizing the total driving time.
+
+    This pure function is turned into a callable class by the decorator `.dispatcherclass` whose __init__ accepts
+    optional arguments, see the docstring of `.dispatcherclass` for details.
+
+    See the dispatcher interface in :ref:`desc_dispatcher` for details.
+
+
+    Parameters
+    ----------
+    request
+        request to be serviced.
+    stoplist
+        stoplist of the vehicle, to be mapped to a new stoplist.
+    space
+        transport space the vehicle is operating on.
+    seat_capacity
+            the maximum number of `.TransportationRequest` s that can be in a vehicle at the same time.
+
+    Returns
+    -------
+        The best solution as defined in `.SingleVehicleSolution`.
+    """
+    min_cost, best_insertion = _find_best_insertion(
+        request, stoplist, space, seat_capacity
+    )
+
+    if best_insertion is None:
+        # no feasible insertion exists, min_cost is still infinite
+        return min_cost, None, (nan, nan, nan, nan)
+
+    best_pickup_idx, best_dropoff_idx = best_insertion
+    # lazy %-formatting, so nothing is formatted unless DEBUG is enabled
+    logger.debug("Best insertion: %s, min cost: %s", best_insertion, min_cost)
+
+    new_stoplist = insert_request_to_stoplist_drive_first(
+        stoplist=stoplist,
+        request=request,
+        pickup_idx=best_pickup_idx,
+        dropoff_idx=best_dropoff_idx,
+        space=space,
+    )
+    # the inserted stops carry the request's time windows unchanged, so there is
+    # no need to look them up in the new stoplist
+    return (
+        min_cost,
+        new_stoplist,
+        (
+            request.pickup_timewindow_min,
+            request.pickup_timewindow_max,
+            request.delivery_timewindow_min,
+            request.delivery_timewindow_max,
+        ),
+    )
@@ -1,4 +1,4 @@
-import numpy as np
+from math import inf
 
 from ridepy.data_structures import (
     TransportationRequest,
@@ -46,39 +46,42 @@ def TaxicabDispatcherDriveFirst(
     # TODO: When we have multi-passenger requests, this dispatcher needs to be changed and
     # include capacity constraints. Currently, taxi := single seat
     assert seat_capacity == 1
+    # Stops and requests carry 0 and inf as defaults for their unbounded time
+    # window limits, so no None-checks are necessary here.
+    last_stop = stoplist[-1]
     CPAT_pu = max(
-        stoplist[-1].estimated_arrival_time,
-        stoplist[-1].time_window_min if stoplist[-1].time_window_min is not None else 0,
-    ) + space.t(stoplist[-1].location, request.origin)
+        last_stop.estimated_arrival_time, last_stop.time_window_min
+    ) + space.t(last_stop.location, request.origin)
     EAST_pu = request.pickup_timewindow_min
     CPAT_do = max(EAST_pu, CPAT_pu) + space.t(request.origin, request.destination)
-    LAST_pu = (
-        CPAT_pu + request.delivery_timewindow_max
-        if request.delivery_timewindow_max is not None
-        else np.inf
-    )
+    LAST_pu = CPAT_pu + request.delivery_timewindow_max
     EAST_do = EAST_pu
-    LAST_do = np.inf
+    LAST_do = inf
 
     cost = CPAT_do
-    stoplist = stoplist + [
-        Stop(
-            location=request.origin,
-            request=request,
-            action=StopAction.pickup,
-            estimated_arrival_time=CPAT_pu,
-            occupancy_after_servicing=stoplist[-1].occupancy_after_servicing + 1,
-            time_window_min=EAST_pu,
-            time_window_max=LAST_pu,
-        ),
-        Stop(
-            location=request.destination,
-            request=request,
-            action=StopAction.dropoff,
-            estimated_arrival_time=CPAT_do,
-            occupancy_after_servicing=0,
-            time_window_min=EAST_do,
-            time_window_max=LAST_do,
-        ),
-    ]
-    return cost, stoplist, (EAST_pu, LAST_pu, EAST_do, LAST_do)
+    pickup_stop = Stop(
+        location=request.origin,
+        request=request,
+        action=StopAction.pickup,
+        estimated_arrival_time=CPAT_pu,
+        occupancy_after_servicing=last_stop.occupancy_after_servicing + 1,
+        time_window_min=EAST_pu,
+        time_window_max=LAST_pu,
+    )
+    dropoff_stop = Stop(
+        location=request.destination,
+        request=request,
+        action=StopAction.dropoff,
+        estimated_arrival_time=CPAT_do,
+        occupancy_after_servicing=0,
+        time_window_min=EAST_do,
+        time_window_max=LAST_do,
+    )
+
+    # The vehicle state keeps referring to the original stoplist until the new one
+    # has been selected, so we must not append to it. Copy it once instead and
+    # append to the copy in place, without creating an intermediate list.
+    new_stoplist = stoplist.copy()
+    new_stoplist.append(pickup_stop)
+    new_stoplist.append(dropoff_stop)
+    return cost, new_stoplist, (EAST_pu, LAST_pu, EAST_do, LAST_do)
@@ -1,4 +1,5 @@
 from .dispatchers import (
     BruteForceTotalTravelTimeMinimizingDispatcher,
     SimpleEllipseDispatcher,
+    TaxicabDispatcherDriveFirst,
 )
@@ -35,103 +35,160 @@ InsertionResult<Loc> brute_force_total_traveltime_minimizing_dispatcher(
 
   */
   double min_cost = INFINITY;
+  const int n_stops = static_cast<int>(stoplist.size());
+
+  // Copy the stop attributes read by the search into contiguous arrays
+  // (struct of arrays), so that the loops below, and in particular the time
+  // window checks walking the remaining stoplist, do not have to stride over
+  // whole Stop objects.
+  vector<double> arrival_times(n_stops), time_window_mins(n_stops),
+      time_window_maxs(n_stops);
+  vector<int> occupancies(n_stops);
+  for (int k = 0; k < n_stops; ++k) {
+    arrival_times[k] = stoplist[k].estimated_arrival_time;
+    time_window_mins[k] = stoplist[k].time_window_min;
+    time_window_maxs[k] = stoplist[k].time_window_max;
+    occupancies[k] = stoplist[k].occupancy_after_servicing;
+  }
+
+  // Compute all travel times the search needs once, stored as plain arrays
+  // indexed by stop, instead of querying the space repeatedly inside the loops.
+  //   time_to_origin[i]:         stop i -> request origin
+  //   time_to_destination[i]:    stop i -> request destination
+  //   time_from_origin[i]:       request origin -> stop i+1 (0 for the last)
+  //   time_from_destination[i]:  request destination -> stop i+1 (0 for the
+  //                              last)
+  //   leg_times[i]:              stop i -> stop i+1 (0 for the last)
+  vector<double> time_to_origin(n_stops), time_to_destination(n_stops),
+      time_from_origin(n_stops, 0), time_from_destination(n_stops, 0),
+      leg_times(n_stops, 0);
+  // The travel times are queried grouped by their origin, which allows spaces
+  // that compute all travel times from one origin at once to reuse them.
+  for (int k = 0; k < n_stops; ++k) {
+    time_to_origin[k] = space.t(stoplist[k].location, request->origin);
+    time_to_destination[k] =
+        space.t(stoplist[k].location, request->destination);
+    leg_times[k] = time_from_current_stop_to_next(stoplist, k, space);
+  }
+  for (int k = 0; k < n_stops; ++k)
+    time_from_origin[k] =
+        time_to_stop_after_insertion(stoplist, request->origin, k, space);
+  for (int k = 0; k < n_stops; ++k)
+    time_from_destination[k] =
+        time_to_stop_after_insertion(stoplist, request->destination, k, space);
+  const double time_direct = space.t(request->origin, request->destination);
+
+  // The detour caused by inserting the dropoff after stop j does not depend on
+  // where the pickup has been inserted before. Its suffix minimum is thus a
+  // lower bound on the dropoff cost of all remaining insertions after stop j,
+  // which allows to skip pickup positions and to stop scanning dropoff
+  // positions as soon as no improvement over the best insertion found so far
+  // is possible anymore. The trailing infinity stands for the (empty) set of
+  // dropoffs after the last stop.
+  vector<double> dropoff_costs(n_stops),
+      min_remaining_dropoff_costs(n_stops + 1, INFINITY);
+  for (int k = n_stops - 1; k >= 0; --k) {
+    dropoff_costs[k] =
+        time_to_destination[k] + time_from_destination[k] - leg_times[k];
+    min_remaining_dropoff_costs[k] =
+        min(dropoff_costs[k], min_remaining_dropoff_costs[k + 1]);
+  }
 
   // Warning: i,j refers to the indices where the new stop would be inserted. So
   // i-1/j-1 is the index of the stop preceding the stop to be inserted.
   pair<int, int> best_insertion{0, 0};
-  int i = -1;
-  for (auto &stop_before_pickup : stoplist) {
-    i++; // The first iteration of the loop: i = 0
-    if (stop_before_pickup.occupancy_after_servicing == seat_capacity) {
+  // Insertions costing more than cost_bound are not considered, see below.
+  double cost_bound = INFINITY;
+  // Scans all insertions with the pickup after stop i.
+  auto scan_insertions_with_pickup_after = [&](int i) {
+    if (occupancies[i] == seat_capacity) {
       // inserting here will violate capacity constraint
-      continue;
+      return;
     }
     // (new stop would be inserted at idx=1). Insertion at idx=0 impossible.
-    auto time_to_pickup = space.t(stop_before_pickup.location, request->origin);
-    auto CPAT_pu = cpat_of_inserted_stop(stop_before_pickup, time_to_pickup);
+    auto time_to_pickup = time_to_origin[i];
+    auto CPAT_pu = max(arrival_times[i], time_window_mins[i]) + time_to_pickup;
     // check for request's pickup timewindow violation
     if (CPAT_pu > request->pickup_timewindow_max)
-      continue;
+      return;
     auto EAST_pu = request->pickup_timewindow_min;
 
     // dropoff immediately
-    auto CPAT_do =
-        max(EAST_pu, CPAT_pu) + space.t(request->origin, request->destination);
-    auto EAST_do = request->delivery_timewindow_min;
+    auto CPAT_do = max(EAST_pu, CPAT_pu) + time_direct;
     // check for request's dropoff timewindow violation
     if (CPAT_do > request->delivery_timewindow_max)
-      continue;
+      return;
     // compute the cost function
-    auto time_to_dropoff = space.t(request->origin, request->destination);
-    auto time_from_dropoff =
-        time_to_stop_after_insertion(stoplist, request->destination, i, space);
+    auto time_to_dropoff = time_direct;
+    auto time_from_dropoff = time_from_destination[i];
 
-    auto original_pickup_edge_length =
-        time_from_current_stop_to_next(stoplist, i, space);
+    auto original_pickup_edge_length = leg_times[i];
     auto total_cost = (time_to_pickup + time_to_dropoff + time_from_dropoff -
                        original_pickup_edge_length);
-    if (total_cost < min_cost) {
+    if (total_cost < min_cost && total_cost <= cost_bound) {
       // check for constraint violations at later points
       auto cpat_at_next_stop =
           max(CPAT_do, request->delivery_timewindow_min) + time_from_dropoff;
-      if (!(is_timewindow_violated_dueto_insertion(stoplist, i,
-                                                   cpat_at_next_stop))) {
+      if (!(is_timewindow_violated_dueto_insertion(
+              arrival_times, time_window_mins, time_window_maxs, i,
+              cpat_at_next_stop))) {
         best_insertion = {i, i};
         min_cost = total_cost;
       }
     }
     // Try dropoff not immediately after pickup
-    auto time_from_pickup =
-        time_to_stop_after_insertion(stoplist, request->origin, i, space);
-    auto cpat_at_next_stop =
-        (max(CPAT_pu, request->pickup_timewindow_min) + time_from_pickup);
-    if (is_timewindow_violated_dueto_insertion(stoplist, i, cpat_at_next_stop))
-      continue;
+    auto time_from_pickup = time_from_origin[i];
     auto pickup_cost =
         (time_to_pickup + time_from_pickup - original_pickup_edge_length);
+    // No dropoff insertion after this pickup can be cheaper. Checking the cost
+    // first spares us walking the stoplist for time window violations.
+    auto min_dropoff_cost = pickup_cost + min_remaining_dropoff_costs[i + 1];
+    if (min_dropoff_cost >= min_cost || min_dropoff_cost > cost_bound)
+      return;
+    auto cpat_at_next_stop =
+        (max(CPAT_pu, request->pickup_timewindow_min) + time_from_pickup);
+    if (is_timewindow_violated_dueto_insertion(arrival_times, time_window_mins,
+                                               time_window_maxs, i,
+                                               cpat_at_next_stop))
+      return;
 
     double delta_cpat = 0;
-    if (i < static_cast<int>(stoplist.size() - 1))
-      delta_cpat = cpat_at_next_stop - stoplist[i + 1].estimated_arrival_time;
+    if (i < n_stops - 1)
+      delta_cpat = cpat_at_next_stop - arrival_times[i + 1];
 
-    int j = i;
-    //        BOOST_FOREACH(auto stop_before_dropoff,
-    //        boost::make_iterator_range(stoplist.begin()+i, stoplist.end()))
-    for (auto stop_before_dropoff = stoplist.begin() + i + 1;
-         stop_before_dropoff != stoplist.end(); ++stop_before_dropoff) {
-      j++; // first iteration: dropoff after j=(i+1)'th stop. pickup was after
-           // i'th stop.
+    for (int j = i + 1; j < n_stops; ++j) {
+      // dropoff after j'th stop. pickup was after i'th stop.
       // Need to check for seat capacity constraints. Note the loop: the
       // constraint was not violated after servicing the previous stop
       // (otherwise we wouldn't've reached this line). Need to check that the
       // constraint is not violated due to the action at this stop
       // (stop_before_dropoff)
-      if (stop_before_dropoff->occupancy_after_servicing == seat_capacity) {
+      if (occupancies[j] == seat_capacity) {
         // Capacity is violated. We need to break off this loop because no
         // insertion either here or at a later stop is permitted
         break;
       }
-      time_to_dropoff =
-          space.t(stop_before_dropoff->location, request->destination);
-      CPAT_do = cpat_of_inserted_stop(*stop_before_dropoff, time_to_dropoff,
-                                      delta_cpat);
+      // no dropoff insertion at this or any later stop can be cheaper
+      min_dropoff_cost = pickup_cost + min_remaining_dropoff_costs[j];
+      if (min_dropoff_cost >= min_cost || min_dropoff_cost > cost_bound)
+        break;
+      time_to_dropoff = time_to_destination[j];
+      // departure at the stop before the dropoff, taking the delay into account
+      auto new_departure_time =
+          max(arrival_times[j] + delta_cpat, time_window_mins[j]);
+      CPAT_do = new_departure_time + time_to_dropoff;
       if (CPAT_do > request->delivery_timewindow_max)
         break;
-      time_from_dropoff = time_to_stop_after_insertion(
-          stoplist, request->destination, j, space);
-      auto original_dropoff_edge_length =
-          time_from_current_stop_to_next(stoplist, j, space);
-      auto dropoff_cost =
-          (time_to_dropoff + time_from_dropoff - original_dropoff_edge_length);
-
-      total_cost = pickup_cost + dropoff_cost;
+      time_from_dropoff = time_from_destination[j];
+      total_cost = pickup_cost + dropoff_costs[j];
 
-      if (total_cost < min_cost) {
+      if (total_cost < min_cost && total_cost <= cost_bound) {
         // cost has decreased. check for constraint violations at later stops
         cpat_at_next_stop = (max(CPAT_do, request->delivery_timewindow_min) +
                              time_from_dropoff);
-        if (!(is_timewindow_violated_dueto_insertion(stoplist, j,
-                                                     cpat_at_next_stop))) {
+        if (!(is_timewindow_violated_dueto_insertion(
+                arrival_times, time_window_mins, time_window_maxs, j,
+                cpat_at_next_stop))) {
           best_insertion = {i, j};
           min_cost = total_cost;
         }
@@ -140,13 +197,39 @@ InsertionResult<Loc> brute_force_total_traveltime_minimizing_dispatcher(
       // we will try inserting the dropoff at a later stop
       // the delta_cpat is important to compute correctly for the next stop, it
       // may have changed if we had any slack time at this one
-      auto new_departure_time =
-          max(stop_before_dropoff->estimated_arrival_time + delta_cpat,
-              stop_before_dropoff->time_window_min);
       delta_cpat =
-          new_departure_time - stop_before_dropoff->estimated_departure_time();
+          new_departure_time - max(arrival_times[j], time_window_mins[j]);
+    }
+  };
+
+  // The pickup position with the smallest lower bound on the cost of its
+  // insertions usually admits an insertion that is (nearly) optimal. Scanning
+  // it first yields the cost of a feasible insertion, which bounds the optimal
+  // cost from above. All insertions costing more can then be skipped during the
+  // actual scan, which still visits the insertions in their original order and
+  // thus breaks ties in favor of the first one, as before.
+  int most_promising_pickup_idx = -1;
+  double min_lower_bound = INFINITY;
+  for (int i = 0; i < n_stops; ++i) {
+    auto lower_bound =
+        time_to_origin[i] - leg_times[i] +
+        min(time_direct + time_from_destination[i],
+            time_from_origin[i] + min_remaining_dropoff_costs[i + 1]);
+    if (occupancies[i] != seat_capacity && lower_bound < min_lower_bound) {
+      min_lower_bound = lower_bound;
+      most_promising_pickup_idx = i;
     }
   }
+  if (most_promising_pickup_idx >= 0) {
+    scan_insertions_with_pickup_after(most_promising_pickup_idx);
+    cost_bound = min_cost;
+    min_cost = INFINITY;
+    best_insertion = {0, 0};
+  }
+
+  for (int i = 0; i < n_stops; ++i)
+    scan_insertions_with_pickup_after(i);
+
   if (min_cost < INFINITY) {
     int best_pickup_idx = best_insertion.first;
     int best_dropoff_idx = best_insertion.second;
@@ -161,8 +244,14 @@ InsertionResult<Loc> brute_force_total_traveltime_minimizing_dispatcher(
     //
     //        }
 
+    // the travel times to and from the new stops are known from the search
     auto new_stoplist = insert_request_to_stoplist_drive_first(
-        stoplist, request, best_pickup_idx, best_dropoff_idx, space);
+        stoplist, request, best_pickup_idx, best_dropoff_idx,
+        time_to_origin[best_pickup_idx], time_from_origin[best_pickup_idx],
+        best_dropoff_idx == best_pickup_idx
+            ? time_direct
+            : time_to_destination[best_dropoff_idx],
+        time_from_destination[best_dropoff_idx]);
     if (debug) {
       std::cout << "Best insertion: " << best_pickup_idx << ", "
                 << best_dropoff_idx << std::endl;
@@ -226,19 +315,21 @@ simple_ellipse_dispatcher(std::shared_ptr<TransportationRequest<Loc>> request,
   double min_cost = INFINITY;
   bool insertion_found = false;
 
+  // A detour over an edge of zero length is infinitely large, which the IEEE
+  // division yields on its own. Only a vanishing detour needs special care, as
+  // it must not become NaN for edges of zero length.
   auto relative_detour = [](auto absolute_detour,
                             auto original_edge_length) -> double {
-    if (absolute_detour == 0)
-      return 0;
-    else if (original_edge_length == 0)
-      INFINITY;
-    else
-      return absolute_detour / original_edge_length;
+    return absolute_detour == 0 ? 0 : absolute_detour / original_edge_length;
   };
 
   // Warning: i,j refers to the indices where the new stop would be inserted. So
   // i-1/j-1 is the index of the stop preceding the stop to be inserted.
   pair<int, int> best_insertion{0, 0};
+  // The travel times to and from the new stops of the chosen insertion, which
+  // are kept for building the new stoplist without querying the space again.
+  double best_time_to_pickup = 0, best_time_from_pickup = 0;
+  double best_time_to_dropoff = 0, best_time_from_dropoff = 0;
   int i = -1;
   for (auto stop_before_pickup = stoplist.begin();
        stop_before_pickup != stoplist.end() - 1; ++stop_before_pickup) {
@@ -277,6 +368,10 @@ simple_ellipse_dispatcher(std::shared_ptr<TransportationRequest<Loc>> request,
         max_relative_detour) {
       // found an insertion, stop looking
       best_insertion = {i, i};
+      best_time_to_pickup = time_to_pickup;
+      best_time_from_pickup = time_from_pickup;
+      best_time_to_dropoff = time_to_dropoff;
+      best_time_from_dropoff = time_from_dropoff;
       min_cost = 0;
       insertion_found = true;
       break;
@@ -313,6 +408,10 @@ simple_ellipse_dispatcher(std::shared_ptr<TransportationRequest<Loc>> request,
         continue;
       else {
         best_insertion = {i, j};
+        best_time_to_pickup = time_to_pickup;
+        best_time_from_pickup = time_from_pickup;
+        best_time_to_dropoff = time_to_dropoff;
+        best_time_from_dropoff = time_from_dropoff;
         min_cost = 0;
         insertion_found = true;
         break;
@@ -325,6 +424,9 @@ simple_ellipse_dispatcher(std::shared_ptr<TransportationRequest<Loc>> request,
       j = stoplist.size() - 1;
       time_to_dropoff = space.t(stoplist[j].location, request->destination);
       best_insertion = {i, j}; // will be inserted after LEN-1'th stop
+      best_time_to_pickup = time_to_pickup;
+      best_time_from_pickup = time_from_pickup;
+      best_time_to_dropoff = time_to_dropoff;
       min_cost = time_to_dropoff;
       insertion_found = true;
       break;
@@ -333,8 +435,9 @@ simple_ellipse_dispatcher(std::shared_ptr<TransportationRequest<Loc>> request,
   if (insertion_found == false) {
     // both pickup and dropoff have to be appended
     i = stoplist.size() - 1;
-    min_cost = space.t(stoplist[i].location, request->origin) +
-               space.t(request->origin, request->destination);
+    best_time_to_pickup = space.t(stoplist[i].location, request->origin);
+    best_time_to_dropoff = space.t(request->origin, request->destination);
+    min_cost = best_time_to_pickup + best_time_to_dropoff;
     best_insertion = {i, i}; // will be inserted after LEN-1'th stop
   }
 
@@ -342,7 +445,9 @@ simple_ellipse_dispatcher(std::shared_ptr<TransportationRequest<Loc>> request,
     int best_pickup_idx = best_insertion.first;
     int best_dropoff_idx = best_insertion.second;
     auto new_stoplist = insert_request_to_stoplist_drive_first(
-        stoplist, request, best_pickup_idx, best_dropoff_idx, space);
+        stoplist, request, best_pickup_idx, best_dropoff_idx,
+        best_time_to_pickup, best_time_from_pickup, best_time_to_dropoff,
+        best_time_from_dropoff);
     if (debug) {
       std::cout << "Best insertion: " << best_pickup_idx << ", "
                 << best_dropoff_idx << std::endl;
@@ -360,6 +465,64 @@ simple_ellipse_dispatcher(std::shared_ptr<TransportationRequest<Loc>> request,
   }
 }
 
+template <typename Loc>
+InsertionResult<Loc> taxicab_dispatcher_drive_first(
+    std::shared_ptr<TransportationRequest<Loc>> request,
+    vector<Stop<Loc>> &stoplist, TransportSpace<Loc> &space, int seat_capacity,
+    bool debug = false) {
+  /*
+  Dispatcher that maps a vehicle's stoplist and a request to a new stoplist
+  by simply appending the necessary stops to the existing stoplist.
+
+  Mirrors the pure Python TaxicabDispatcherDriveFirst. Like there, the seat
+  capacity is not checked, as a taxi serves a single request at a time.
+
+  Parameters
+  ----------
+  request
+      request to be serviced
+  stoplist
+      stoplist of the vehicle, to be mapped to a new stoplist
+  space
+      transport space the vehicle is operating on
+  debug
+    Print debug info
+
+  Returns
+  -------
+
+  */
+  auto &last_stop = stoplist.back();
+  double CPAT_pu = last_stop.estimated_departure_time() +
+                   space.t(last_stop.location, request->origin);
+  double EAST_pu = request->pickup_timewindow_min;
+  double CPAT_do =
+      max(EAST_pu, CPAT_pu) + space.t(request->origin, request->destination);
+  double LAST_pu = CPAT_pu + request->delivery_timewindow_max;
+  double EAST_do = EAST_pu;
+  double LAST_do = INFINITY;
+
+  double cost = CPAT_do;
+
+  // The vehicle state keeps referring to the original stoplist until the new
+  // one has been selected, so we must not append to it. Copy it once instead,
+  // with room for the two new stops.
+  vector<Stop<Loc>> new_stoplist;
+  new_stoplist.reserve(stoplist.size() + 2);
+  new_stoplist.assign(stoplist.begin(), stoplist.end());
+  new_stoplist.emplace_back(request->origin, request, StopAction::pickup,
+                            CPAT_pu, last_stop.occupancy_after_servicing + 1,
+                            EAST_pu, LAST_pu);
+  new_stoplist.emplace_back(request->destination, request, StopAction::dropoff,
+                            CPAT_do, 0, EAST_do, LAST_do);
+  if (debug) {
+    std::cout << "Appended request " << request->request_id
+              << ", cost: " << cost << std::endl;
+  }
+  return InsertionResult<Loc>{std::move(new_stoplist), cost, EAST_pu, LAST_pu,
+                              EAST_do, LAST_do};
+}
+
 template <typename Loc> class AbstractDispatcher {
 public:
   virtual InsertionResult<Loc>
@@ -400,6 +563,18 @@ public:
   }
 };
 
+template <typename Loc>
+class TaxicabDispatcherDriveFirst : public AbstractDispatcher<Loc> {
+public:
+  InsertionResult<Loc>
+  operator()(std::shared_ptr<TransportationRequest<Loc>> request,
+             vector<Stop<Loc>> &stoplist, TransportSpace<Loc> &space,
+             int seat_capacity, bool debug = false) {
+    return taxicab_dispatcher_drive_first(request, stoplist, space,
+                                          seat_capacity, debug);
+  }
+};
+
 } // namespace ridepy
 
 #endif // RIDEPY_CDISPATCHERS_H
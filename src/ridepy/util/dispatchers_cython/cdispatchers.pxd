@@ -22,6 +22,11 @@ cdef extern from "cdispatchers.h" namespace 'ridepy':
           bint debug
     )
 
+    InsertionResult[Loc] taxicab_dispatcher_drive_first[Loc](
+          shared_ptr[TransportationRequest[Loc]] request,
+          vector[Stop[Loc]] &stoplist,
+          const TransportSpace &space, int seat_capacity, bint debug)
+
     cdef cppclass AbstractDispatcher[Loc]:
         AbstractDispatcher()
 
@@ -30,3 +35,6 @@ cdef extern from "cdispatchers.h" namespace 'ridepy':
 
     cdef cppclass SimpleEllipseDispatcher[Loc](AbstractDispatcher[Loc]):
         SimpleEllipseDispatcher(double)
+
+    cdef cppclass TaxicabDispatcherDriveFirst[Loc](AbstractDispatcher[Loc]):
+        TaxicabDispatcherDriveFirst()
@@ -15,11 +15,28 @@ std::vector<Stop<Loc>> insert_request_to_stoplist_drive_first(
     std::shared_ptr<TransportationRequest<Loc>> request, int pickup_idx,
     int dropoff_idx, TransportSpace<Loc> &space, int n_passengers = 1);
 
+template <typename Loc>
+std::vector<Stop<Loc>> insert_request_to_stoplist_drive_first(
+    std::vector<Stop<Loc>> &stoplist,
+    std::shared_ptr<TransportationRequest<Loc>> request, int pickup_idx,
+    int dropoff_idx, double time_to_pickup, double time_from_pickup,
+    double time_to_dropoff, double time_from_dropoff, int n_passengers = 1);
+
 template <typename Loc>
 void insert_stop_to_stoplist_drive_first(std::vector<Stop<Loc>> &stoplist,
                                          Stop<Loc> &stop, int idx,
                                          TransportSpace<Loc> &space);
 
+template <typename Loc>
+void insert_stop_to_stoplist_drive_first(std::vector<Stop<Loc>> &stoplist,
+                                         Stop<Loc> &stop, int idx,
+                                         double time_to_new_stop,
+                                         double time_from_new_stop);
+
+template <typename Loc>
+double propagate_delay_drive_first(std::vector<Stop<Loc>> &stoplist, int first,
+                                   int last, double delta_cpat);
+
 template <typename Loc>
 double cpat_of_inserted_stop(Stop<Loc> &stop_before,
                              double time_from_stop_before,
@@ -39,6 +56,12 @@ bool is_timewindow_violated_dueto_insertion(
     const std::vector<Stop<Loc>> &stoplist, int idx,
     double est_arrival_first_stop_after_insertion);
 
+inline bool is_timewindow_violated_dueto_insertion(
+    const std::vector<double> &arrival_times,
+    const std::vector<double> &time_window_mins,
+    const std::vector<double> &time_window_maxs, int idx,
+    double est_arrival_first_stop_after_insertion);
+
 /* Now the implementations */
 template <typename Loc>
 std::vector<Stop<Loc>> insert_request_to_stoplist_drive_first(
@@ -50,40 +73,100 @@ std::vector<Stop<Loc>> insert_request_to_stoplist_drive_first(
   pickup(dropoff)_idx. The estimated arrival times at all the stops are updated
   assuming a drive-first strategy.
   */
+  auto time_to_pickup = space.t(stoplist[pickup_idx].location, request->origin);
+  auto time_from_pickup = time_to_stop_after_insertion(
+      stoplist, request->origin, pickup_idx, space);
+  // if the dropoff directly follows the pickup, it is reached from the origin
+  auto time_to_dropoff =
+      dropoff_idx == pickup_idx
+          ? space.t(request->origin, request->destination)
+          : space.t(stoplist[dropoff_idx].location, request->destination);
+  auto time_from_dropoff = time_to_stop_after_insertion(
+      stoplist, request->destination, dropoff_idx, space);
+
+  return insert_request_to_stoplist_drive_first(
+      stoplist, request, pickup_idx, dropoff_idx, time_to_pickup,
+      time_from_pickup, time_to_dropoff, time_from_dropoff, n_passengers);
+}
+
+template <typename Loc>
+std::vector<Stop<Loc>> insert_request_to_stoplist_drive_first(
+    std::vector<Stop<Loc>> &stoplist,
+    std::shared_ptr<TransportationRequest<Loc>> request, int pickup_idx,
+    int dropoff_idx, double time_to_pickup, double time_from_pickup,
+    double time_to_dropoff, double time_from_dropoff, int n_passengers) {
+  /*
+  Same as above, but with the travel times to and from the new stops already
+  known, e.g. from the search for the best insertion, so that the space need
+  not be queried again:
+      time_to_pickup:    stop at pickup_idx -> request origin
+      time_from_pickup:  request origin -> stop at pickup_idx+1
+      time_to_dropoff:   stop at dropoff_idx (or the pickup, if dropoff_idx ==
+                         pickup_idx) -> request destination
+      time_from_dropoff: request destination -> stop at dropoff_idx+1
+  The times from the new stops are disregarded if there is no later stop, and
+  time_from_pickup also if the dropoff directly follows the pickup.
+  */
+
+  // We don't want to modify stoplist in place. Assemble the new stoplist in a
+  // single pass instead, copying the existing stops around the two new ones,
+  // so that no stops have to be shifted for inserting them. The new stoplist
+  // is laid out as follows:
+  // 0,1,...,pickup_idx,(pickup),...,dropoff_idx+1,(dropoff),dropoff_idx+3,...
+  const int n_stops = static_cast<int>(stoplist.size());
+  std::vector<Stop<Loc>> new_stoplist;
+  new_stoplist.reserve(n_stops + 2);
+  new_stoplist.insert(new_stoplist.end(), stoplist.begin(),
+                      stoplist.begin() + pickup_idx + 1);
 
-  // We don't want to modify stoplist in place. Make a copy.
-  std::vector<Stop<Loc>> new_stoplist{stoplist}; // TODO: NEED TO copy?
   // Handle the pickup
   auto &stop_before_pickup = new_stoplist[pickup_idx];
-  auto cpat_at_pu = stop_before_pickup.estimated_departure_time() +
-                    space.t(stop_before_pickup.location, request->origin);
-  Stop<Loc> pickup_stop(
-      request->origin, request, StopAction::pickup, cpat_at_pu,
+  new_stoplist.emplace_back(
+      request->origin, request, StopAction::pickup,
+      cpat_of_inserted_stop(stop_before_pickup, time_to_pickup),
       stop_before_pickup.occupancy_after_servicing + n_passengers,
       request->pickup_timewindow_min, request->pickup_timewindow_max);
 
   // increase the occupancies of all the stops between pickup and dropoff
-  // remember, the indices are as follows:
-  // 0,1,...,pickup_idx,(pickup_not_yet_inserted),...,dropoff_idx,(dropoff_not_yet_inserted),
-  // ...
-  for (auto s = new_stoplist.begin() + pickup_idx + 1;
-       s != new_stoplist.begin() + dropoff_idx + 1; ++s) {
-    s->occupancy_after_servicing += n_passengers;
+  for (int k = pickup_idx + 1; k <= dropoff_idx; ++k) {
+    new_stoplist.push_back(stoplist[k]);
+    new_stoplist.back().occupancy_after_servicing += n_passengers;
   }
 
-  insert_stop_to_stoplist_drive_first(new_stoplist, pickup_stop, pickup_idx,
-                                      space);
-  // Handle the dropoff
-  dropoff_idx += 1;
-  auto &stop_before_dropoff = new_stoplist[dropoff_idx];
-  auto cpat_at_do = stop_before_dropoff.estimated_departure_time() +
-                    space.t(stop_before_dropoff.location, request->destination);
-  Stop<Loc> dropoff_stop(
-      request->destination, request, StopAction::dropoff, cpat_at_do,
-      stop_before_dropoff.occupancy_after_servicing - n_passengers,
+  // The dropoff's arrival time depends on the delay caused by the pickup and is
+  // set below.
+  const int new_dropoff_idx = dropoff_idx + 2;
+  new_stoplist.emplace_back(
+      request->destination, request, StopAction::dropoff, 0,
+      new_stoplist.back().occupancy_after_servicing - n_passengers,
       request->delivery_timewindow_min, request->delivery_timewindow_max);
-  insert_stop_to_stoplist_drive_first(new_stoplist, dropoff_stop, dropoff_idx,
-                                      space);
+  new_stoplist.insert(new_stoplist.end(), stoplist.begin() + dropoff_idx + 1,
+                      stoplist.end());
+
+  if (dropoff_idx > pickup_idx) {
+    // delay the stops between pickup and dropoff due to the pickup
+    auto &pickup_stop = new_stoplist[pickup_idx + 1];
+    auto delta_cpat = pickup_stop.estimated_departure_time() +
+                      time_from_pickup -
+                      new_stoplist[pickup_idx + 2].estimated_arrival_time;
+    propagate_delay_drive_first(new_stoplist, pickup_idx + 2, new_dropoff_idx,
+                                delta_cpat);
+  }
+
+  // Handle the dropoff
+  auto &dropoff_stop = new_stoplist[new_dropoff_idx];
+  dropoff_stop.estimated_arrival_time =
+      cpat_of_inserted_stop(new_stoplist[new_dropoff_idx - 1], time_to_dropoff);
+  if (dropoff_idx < n_stops - 1) {
+    // Delay the stops following the dropoff. The delay of the first one is
+    // computed w.r.t. its original arrival time, so it accounts for both
+    // inserted stops.
+    auto delta_cpat = dropoff_stop.estimated_departure_time() +
+                      time_from_dropoff -
+                      new_stoplist[new_dropoff_idx + 1].estimated_arrival_time;
+    propagate_delay_drive_first(new_stoplist, new_dropoff_idx + 1, n_stops + 2,
+                                delta_cpat);
+  }
   return new_stoplist;
 }
 
@@ -97,39 +180,62 @@ void insert_stop_to_stoplist_drive_first(std::vector<Stop<Loc>> &stoplist,
 
   Returns:
   */
+  double time_to_new_stop = space.t(stoplist[idx].location, stop.location);
+  double time_from_new_stop =
+      time_to_stop_after_insertion(stoplist, stop.location, idx, space);
+  insert_stop_to_stoplist_drive_first(stoplist, stop, idx, time_to_new_stop,
+                                      time_from_new_stop);
+}
+
+template <typename Loc>
+void insert_stop_to_stoplist_drive_first(std::vector<Stop<Loc>> &stoplist,
+                                         Stop<Loc> &stop, int idx,
+                                         double time_to_new_stop,
+                                         double time_from_new_stop) {
+  /*
+  Same as above, but with the travel times from the stop at idx to the new
+  stop and from the new stop to the one at idx+1 already known.
+  */
   auto &stop_before_insertion = stoplist[idx];
-  // Stop later_stop
-  // cdef double departure_previous_stop, cpat_next_stop,  delta_cpat_next_stop,
-  // old_departure, new_departure
-  double time_to_new_stop =
-      space.t(stop_before_insertion.location, stop.location);
   double cpat_new_stop =
       cpat_of_inserted_stop(stop_before_insertion, time_to_new_stop);
   stop.estimated_arrival_time = cpat_new_stop;
   if (idx < static_cast<int>(stoplist.size() - 1)) {
     // update cpats of later stops
     auto departure_previous_stop = stop.estimated_departure_time();
-    auto cpat_next_stop = departure_previous_stop +
-                          space.t(stop.location, stoplist[idx + 1].location);
+    auto cpat_next_stop = departure_previous_stop + time_from_new_stop;
     auto delta_cpat_next_stop =
         cpat_next_stop - stoplist[idx + 1].estimated_arrival_time;
-    //        BOOST_FOREACH(auto later_stop,
-    //        boost::make_iterator_range(stoplist.begin()+idx + 1,
-    //        stoplist.end()))
-    for (auto later_stop = stoplist.begin() + idx + 1;
-         later_stop != stoplist.end(); ++later_stop) {
-      auto old_departure = later_stop->estimated_departure_time();
-      later_stop->estimated_arrival_time += delta_cpat_next_stop;
-      auto new_departure = later_stop->estimated_departure_time();
-
-      auto delta_cpat_next_stop = new_departure - old_departure;
-      if (delta_cpat_next_stop == 0)
-        break;
-    }
+    propagate_delay_drive_first(stoplist, idx + 1,
+                                static_cast<int>(stoplist.size()),
+                                delta_cpat_next_stop);
   }
   stoplist.insert(stoplist.begin() + idx + 1, stop);
 }
 
+template <typename Loc>
+double propagate_delay_drive_first(std::vector<Stop<Loc>> &stoplist, int first,
+                                   int last, double delta_cpat) {
+  /*
+  Delays the stops in [first, last) by delta_cpat, assuming a drive-first
+  strategy. Stops with slack time absorb (part of) the delay, the remainder is
+  passed on to the next stop. Returns the delay remaining after the last stop,
+  stopping early once it has been fully absorbed.
+  */
+  for (auto later_stop = stoplist.begin() + first;
+       later_stop != stoplist.begin() + last; ++later_stop) {
+    auto old_departure = later_stop->estimated_departure_time();
+    later_stop->estimated_arrival_time += delta_cpat;
+    auto new_departure = later_stop->estimated_departure_time();
+
+    // the delay passed on to the next stop, reduced by any slack time here
+    delta_cpat = new_departure - old_departure;
+    if (delta_cpat == 0)
+      break;
+  }
+  return delta_cpat;
+}
+
 template <typename Loc>
 double cpat_of_inserted_stop(Stop<Loc> &stop_before,
                              double time_from_stop_before, double delta_cpat) {
@@ -219,6 +325,47 @@ bool is_timewindow_violated_dueto_insertion(
   return false;
 }
 
+inline bool is_timewindow_violated_dueto_insertion(
+    const std::vector<double> &arrival_times,
+    const std::vector<double> &time_window_mins,
+    const std::vector<double> &time_window_maxs, int idx,
+    double est_arrival_first_stop_after_insertion) {
+  /*
+  Same as above, but operating on the stops' estimated arrival times and time
+  windows stored in separate arrays.
+  */
+  const int n_stops = static_cast<int>(arrival_times.size());
+  if (idx > n_stops - 2)
+    return false;
+
+  // inserted stop incurs zero detour, and we don't have to wait
+  if (est_arrival_first_stop_after_insertion <= arrival_times[idx + 1])
+    return false;
+
+  auto delta_cpat =
+      (est_arrival_first_stop_after_insertion - arrival_times[idx + 1]);
+
+  // Remember that the insertion is *after* idx'th stop. We need to check for
+  // violations from idx+1'th stop onwards
+  for (int k = idx + 1; k < n_stops; ++k) {
+    auto old_leeway = time_window_maxs[k] - arrival_times[k];
+    auto new_leeway = old_leeway - delta_cpat;
+
+    if ((new_leeway < 0) && (new_leeway < old_leeway))
+      return true;
+    else if (time_window_mins[k] >= arrival_times[k] + delta_cpat)
+      // We have to wait or arrive just on time, thus no need to check next
+      // stops
+      return false;
+    else
+      // Otherwise we are incurring additional delay. Compute the remaining
+      // delay:
+      delta_cpat = max(time_window_mins[k], arrival_times[k] + delta_cpat) -
+                   max(time_window_mins[k], arrival_times[k]);
+  }
+  return false;
+}
+
 } // namespace ridepy
 
 #endif // RIDEPY_CDISPATCHERS_UTILS_H
@@ -6,6 +6,7 @@ from .cdispatchers cimport (
 AbstractDispatcher as CAbstractDispatcher,
 BruteForceTotalTravelTimeMinimizingDispatcher as CBruteForceTotalTravelTimeMinimizingDispatcher,
 SimpleEllipseDispatcher as CSimpleEllipseDispatcher,
+TaxicabDispatcherDriveFirst as CTaxicabDispatcherDriveFirst,
 )
 
 
@@ -46,4 +47,14 @@ cdef class SimpleEllipseDispatcher(Dispatcher):
         elif loc_type == LocType.INT:
             self.u_dispatcher.dispatcher_int_ptr = new CSimpleEllipseDispatcher[uiloc](max_relative_detour)
         else:
-            raise ValueError("This line should never have been reached")
\ No newline at end of file
+            raise ValueError("This line should never have been reached")
+
+
+cdef class TaxicabDispatcherDriveFirst(Dispatcher):
+    def __cinit__(self, loc_type):
+        if loc_type == LocType.R2LOC:
+            self.u_dispatcher.dispatcher_r2loc_ptr = new CTaxicabDispatcherDriveFirst[R2loc]()
+        elif loc_type == LocType.INT:
+            self.u_dispatcher.dispatcher_int_ptr = new CTaxicabDispatcherDriveFirst[uiloc]()
+        else:
+            raise ValueError("This line should never have been reached")
@@ -5,11 +5,11 @@ import warnings
 from typing import List, Tuple, Union, Any, Iterator, Sequence
 
 import numpy as np
-import operator as op
 import math as m
 import networkx as nx
 import itertools as it
-from scipy.spatial import distance as spd
+from scipy import sparse
+from scipy.sparse import csgraph
 
 from ridepy.data_structures import TransportSpace, ID, LocType
 from ridepy.util import smartVectorize, make_repr
@@ -56,38 +56,28 @@ class Euclidean(TransportSpace):
         if self.n_dim == 1:
             return abs(v - u)
         else:
-            return spd.euclidean(u, v)
+            # much cheaper than `scipy.spatial.distance.euclidean`, which
+            # validates and converts its arguments to arrays on every call
+            return m.dist(u, v)
 
     def t(self, u, v):
         return self.d(u, v) / self.velocity
 
-    def _coord_sub(self, u, v):
-        if self.n_dim == 1:
-            return u - v
-        else:
-            return map(op.sub, u, v)
-
-    def _coord_mul(self, u, k):
+    def _interpolate(self, u, v, fraction):
+        """
+        Returns the point on the straight line between `u` and `v` that lies
+        `fraction` of the way from `v` back towards `u`.
+        """
         if self.n_dim == 1:
-            return u * k
+            return v - (v - u) * fraction
         else:
-            return map(op.mul, u, it.repeat(k))
+            return tuple(v_i - (v_i - u_i) * fraction for u_i, v_i in zip(u, v))
 
     def interp_dist(self, u, v, dist_to_dest):
-        return (
-            self._coord_sub(
-                v, self._coord_mul(self._coord_sub(v, u), dist_to_dest / self.d(u, v))
-            ),
-            0,
-        )
+        return self._interpolate(u, v, dist_to_dest / self.d(u, v)), 0
 
     def interp_time(self, u, v, time_to_dest):
-        return (
-            self._coord_sub(
-                v, self._coord_mul(self._coord_sub(v, u), time_to_dest / self.t(u, v))
-            ),
-            0,
-        )
+        return self._interpolate(u, v, time_to_dest / self.t(u, v)), 0
 
     def random_point(self):
         return tuple(random.uniform(a, b) for a, b in self.coord_range)
@@ -119,6 +109,13 @@ class Euclidean1D(Euclidean):
     def d(self, u, v):
         return abs(v - u)
 
+    @d.vectorized
+    def d(self, u, v):
+        return np.abs(np.subtract(v, u))
+
+    def t_many(self, origins, destinations):
+        return self.t(origins, destinations).tolist()
+
     def random_point(self):
         return random.uniform(self.coord_range[0][0], self.coord_range[0][1])
 
@@ -138,15 +135,31 @@ class Euclidean2D(Euclidean):
         super().__init__(n_dim=2, coord_range=coord_range, velocity=velocity)
         self.loc_type = LocType.R2LOC
 
-    def _coord_sub(self, u, v):
-        return u[0] - v[0], u[1] - v[1]
-
-    def _coord_mul(self, u, k):
-        return u[0] * k, u[1] * k
+    def _interpolate(self, u, v, fraction):
+        return v[0] - (v[0] - u[0]) * fraction, v[1] - (v[1] - u[1]) * fraction
 
     @smartVectorize
     def d(self, u, v):
-        return m.sqrt(m.pow(v[0] - u[0], 2) + m.pow(v[1] - u[1], 2))
+        # Squaring by multiplication is cheaper than `math.pow` and rounds exactly
+        # like the vectorized version below and the C++ implementation.
+        dx = v[0] - u[0]
+        dy = v[1] - u[1]
+        return m.sqrt(dx * dx + dy * dy)
+
+    @d.vectorized
+    def d(self, u, v):
+        delta = np.subtract(v, u, dtype=float)
+        return np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+
+    def t_many(self, origins, destinations):
+        # For stoplists of typical length, computing the travel times in plain
+        # Python is much faster than converting the locations to arrays. The
+        # floating point operations are exactly those of `d` and `t`.
+        velocity = self.velocity
+        return [
+            m.sqrt((v_x - u_x) * (v_x - u_x) + (v_y - u_y) * (v_y - u_y)) / velocity
+            for (u_x, u_y), (v_x, v_y) in zip(origins, destinations)
+        ]
 
     def asdict(self):
         return dict(coord_range=self.coord_range, velocity=self.velocity)
@@ -191,30 +204,30 @@ class Manhattan2D(TransportSpace):
     def d(self, u, v):
         return abs(u[0] - v[0]) + abs(u[1] - v[1])
 
+    @d.vectorized
+    def d(self, u, v):
+        return np.abs(np.subtract(u, v, dtype=float)).sum(axis=1)
+
     def t(self, u, v):
         return self.d(u, v) / self.velocity
 
-    def _coord_sub(self, u, v):
-        return map(op.sub, u, v)
+    def t_many(self, origins, destinations):
+        if not len(origins):
+            return []
+        return self.t(origins, destinations).tolist()
 
-    def _coord_mul(self, u, k):
-        return map(op.mul, u, it.repeat(k))
+    def _interpolate(self, u, v, fraction):
+        """
+        Returns the point on the straight line between `u` and `v` that lies
+        `fraction` of the way from `v` back towards `u`.
+        """
+        return v[0] - (v[0] - u[0]) * fraction, v[1] - (v[1] - u[1]) * fraction
 
     def interp_dist(self, u, v, dist_to_dest):
-        return (
-            self._coord_sub(
-                v, self._coord_mul(self._coord_sub(v, u), dist_to_dest / self.d(u, v))
-            ),
-            0,
-        )
+        return self._interpolate(u, v, dist_to_dest / self.d(u, v)), 0
 
     def interp_time(self, u, v, time_to_dest):
-        return (
-            self._coord_sub(
-                v, self._coord_mul(self._coord_sub(v, u), time_to_dest / self.t(u, v))
-            ),
-            0,
-        )
+        return self._interpolate(u, v, time_to_dest / self.t(u, v)), 0
 
     def random_point(self):
         return tuple(random.uniform(a, b) for a, b in self.coord_range)
@@ -235,10 +248,35 @@ class Graph(TransportSpace):
     loc_type = LocType.INT
 
     def _update_distance_cache(self):
-        (
-            self._predecessors,
-            self._distances,
-        ) = nx.floyd_warshall_predecessor_and_distance(self.G, "distance")
+        # Let scipy choose the algorithm based on the graph's density. Road-like
+        # graphs are sparse, and running Dijkstra from every vertex is much faster
+        # on them than Floyd-Warshall, which takes O(V^3) time regardless of the
+        # number of edges. On dense graphs, scipy's compiled Floyd-Warshall is the
+        # faster choice. The distances and predecessors are stored as dense
+        # matrices indexed by the vertices' positions in `self._vertex_labels`,
+        # which take much less memory than nested dicts. Unreachable vertices are
+        # at infinite distance and have a negative predecessor index.
+        self._vertex_labels = list(self.G.nodes)
+        self._vertex_index = {
+            label: idx for idx, label in enumerate(self._vertex_labels)
+        }
+        distances, self._predecessors = csgraph.shortest_path(
+            self._adjacency_matrix(),
+            method="auto",
+            directed=True,
+            return_predecessors=True,
+        )
+        # Store the distances in single precision if that represents all of them
+        # exactly, e.g. for integer edge lengths. This halves the memory taken by
+        # the matrix without changing any distance.
+        single_precision_distances = distances.astype(np.float32)
+        if np.array_equal(single_precision_distances, distances):
+            distances = single_precision_distances
+        # Target locations that are not vertices of the graph are infinitely far
+        # away. Their distances are looked up in an additional last column.
+        self._distances = np.hstack(
+            (distances, np.full((len(distances), 1), m.inf, dtype=distances.dtype))
+        )
 
     def __init__(
         self,
@@ -281,6 +319,42 @@ class Graph(TransportSpace):
         self.velocity = velocity
         self._update_distance_cache()
 
+    def _adjacency_matrix(self):
+        """
+        Return the sparse matrix of edge lengths, indexed like `self._vertex_labels`.
+
+        Of several parallel edges in a multigraph, only the shortest one is kept.
+        Converting the graph using `nx.to_scipy_sparse_array` would instead add up
+        the lengths of parallel edges.
+        """
+        n_vertices = len(self._vertex_labels)
+        vertex_index = self._vertex_index
+        edges = np.array(
+            [
+                (vertex_index[u], vertex_index[v], w)
+                for u, v, w in self.G.edges(data="distance")
+            ],
+            dtype=float,
+        ).reshape(-1, 3)
+        sources = edges[:, 0].astype(np.intp)
+        targets = edges[:, 1].astype(np.intp)
+        weights = edges[:, 2]
+        if not self.G.is_directed():
+            sources, targets = np.r_[sources, targets], np.r_[targets, sources]
+            weights = np.r_[weights, weights]
+
+        # Sort the edges by source, target and length, and keep only the first,
+        # i.e. the shortest, edge of each source-target pair.
+        order = np.lexsort((weights, targets, sources))
+        sources, targets, weights = sources[order], targets[order], weights[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+
+        return sparse.csr_array(
+            (weights[first], (sources[first], targets[first])),
+            shape=(n_vertices, n_vertices),
+        )
+
     @staticmethod
     def _make_attribute_distance(G, attribute_name: Union[str, None]):
         """
@@ -383,11 +457,36 @@ class Graph(TransportSpace):
 
     @smartVectorize
     def d(self, u, v):
-        return self._distances[u][v]
+        return self._distances.item(
+            self._vertex_index[u], self._vertex_index.get(v, -1)
+        )
+
+    @d.vectorized
+    def d(self, u, v):
+        # Translate the vertex labels to matrix indices and look up all distances
+        # at once. If a single source node is supplied, only its row of the
+        # distance matrix is indexed.
+        vertex_index = self._vertex_index
+        if np.isscalar(u):
+            sources = vertex_index[u]
+            targets = [vertex_index.get(y, -1) for y in v]
+        elif np.isscalar(v):
+            sources = [vertex_index[x] for x in u]
+            targets = vertex_index.get(v, -1)
+        else:
+            sources = [vertex_index[x] for x in u]
+            targets = [vertex_index.get(y, -1) for y in v]
+        # The distances may be stored in single precision. They are returned in
+        # double precision, so that computations with them are not carried out
+        # in single precision.
+        return self._distances[sources, targets].astype(float, copy=False)
 
     def t(self, u, v) -> Union[int, float]:
         return self.d(u, v) / self.velocity
 
+    def t_many(self, origins, destinations) -> List[Union[int, float]]:
+        return self.t(origins, destinations).tolist()
+
     def interp_dist(self, u, v, dist_to_dest):
         """
 
@@ -407,18 +506,30 @@ class Graph(TransportSpace):
         if u == v:
             return v, 0
 
-        next_node = v
-        while next_node is not u:
-            predecessor = self._predecessors[u][next_node]
-            predecessor_dist = self.d(predecessor, v)
+        # Walk back along the shortest path from v to u in terms of matrix
+        # indices, which spares translating each visited vertex's label.
+        vertex_index = self._vertex_index
+        u_idx = vertex_index[u]
+        predecessors = self._predecessors[u_idx]
+        distances_to_v = self._distances[:, vertex_index[v]]
+
+        # The distances are read as Python floats using `item`, so that they are
+        # not compared in single precision if the matrix is stored as such.
+        next_idx = vertex_index[v]
+        while next_idx != u_idx:
+            predecessor_idx = predecessors.item(next_idx)
+            predecessor_dist = distances_to_v.item(predecessor_idx)
             if predecessor_dist >= dist_to_dest:
                 break
-            next_node = predecessor
+            next_idx = predecessor_idx
 
         if predecessor_dist > dist_to_dest:
-            return next_node, dist_to_dest - self.d(next_node, v)
+            return (
+                self._vertex_labels[next_idx],
+                dist_to_dest - distances_to_v.item(next_idx),
+            )
         else:
-            return predecessor, 0
+            return self._vertex_labels[predecessor_idx], 0
 
     def interp_time(self, u, v, time_to_dest):
         """
@@ -443,10 +554,12 @@ class Graph(TransportSpace):
     def shortest_path_vertex_sequence(self, u, v) -> List[ID]:
         seq = [v]
         if u != v:
-            next_node = v
-            while next_node is not u:
-                next_node = self._predecessors[u][next_node]
-                seq.append(next_node)
+            u_idx = self._vertex_index[u]
+            predecessors = self._predecessors[u_idx]
+            next_idx = predecessors.item(self._vertex_index[v])
+            while next_idx != u_idx:
+                seq.append(self._vertex_labels[next_idx])
+                next_idx = predecessors.item(next_idx)
             seq.append(u)
         return seq[::-1]
 
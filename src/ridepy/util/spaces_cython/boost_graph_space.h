@@ -6,6 +6,8 @@
 #include <boost/graph/graph_traits.hpp>
 #include <boost/property_map/property_map.hpp>
 #include <iostream>
+#include <memory>
+#include <unordered_map>
 #include <utility>
 
 #include "cspaces.h"
@@ -33,16 +35,21 @@ class GraphSpace : public TransportSpace<vertex_t> {
   // Python node ID edge
   typedef pair<vertex_t, vertex_t> Edge;
 
+  // Predecessor and distance vectors of the shortest paths from a single
+  // source. Shared, so that looking them up in the cache does not copy them.
+  typedef std::shared_ptr<const pair<vector<int>, vector<double>>>
+      shortest_paths_t;
+
   // LRU cache for predecessor and distance vectors
-  typedef LRU::Cache<int, pair<vector<int>, vector<double>>> pred_cache_t;
+  typedef LRU::Cache<int, shortest_paths_t> pred_cache_t;
 
   // Boost graph object
   Graph _g;
 
   // Vertex labels are the templated-type node IDs as used in the simulation
   // space Vertex indices are the integer node IDs used by the boost graph
-  // object
-  map<vertex_t, int> vertex_label2index;
+  // object. Hashed, as two labels are looked up for every distance query.
+  std::unordered_map<vertex_t, int> vertex_label2index;
 
   // Vertex and edge properties are stored in property maps
   // TODO Why do we need those, isn't this already in the adjacency list?
@@ -58,17 +65,25 @@ class GraphSpace : public TransportSpace<vertex_t> {
   pred_cache_t pred_cache{
       10000}; // the cache size could be set at initialization
 
+  // Shortest paths from the most recently queried source node
+  int _current_source_idx = -1;
+  shortest_paths_t _current_shortest_paths;
+
   /**
    * Compute the shortest paths from a source node to all other nodes in the
-   * graph and store the results in the predecessor and distance vectors
+   * graph and make them the current predecessor and distance vectors
+   *
+   * Consecutive queries from the same source node, as issued when computing
+   * the distances from one location to many others, reuse the current vectors
+   * without consulting the cache.
    *
    * @param u_idx index of the source node
    */
   void cached_dijkstra(int u_idx) {
+    if (u_idx == this->_current_source_idx)
+      return;
     if (pred_cache.contains(u_idx)) {
-      auto res = pred_cache.lookup(u_idx);
-      this->_predecessors = res.first;
-      this->_distances = res.second;
+      this->_current_shortest_paths = pred_cache.lookup(u_idx);
     } else {
       // Not in cache, compute
       dijkstra_shortest_paths(
@@ -80,9 +95,12 @@ class GraphSpace : public TransportSpace<vertex_t> {
                   &this->_distances[0]) // Named parameter: distance_map
       );
       // Insert into cache
-      pred_cache.insert(u_idx,
-                        make_pair(this->_predecessors, this->_distances));
+      this->_current_shortest_paths =
+          std::make_shared<const pair<vector<int>, vector<double>>>(
+              this->_predecessors, this->_distances);
+      pred_cache.insert(u_idx, this->_current_shortest_paths);
     }
+    this->_current_source_idx = u_idx;
   }
 
 public:
@@ -156,7 +174,8 @@ public:
     // Call dijkstra on the source node
     cached_dijkstra(src_idx);
     // Return the distance to the target node
-    return this->_distances[this->vertex_label2index[target]];
+    const auto &distances = this->_current_shortest_paths->second;
+    return distances[this->vertex_label2index[target]];
   }
 
   /**
@@ -186,7 +205,7 @@ public:
     double dist_from_dest = 0;
     double current_edge_weight = 0;
     while (current_node != u_idx) {
-      predecessor = this->_predecessors[current_node];
+      predecessor = this->_current_shortest_paths->first[current_node];
       auto [e, is_edge] = edge(current_node, predecessor, this->_g);
       current_edge_weight = get(this->edge2weight, e);
       dist_from_dest += current_edge_weight;
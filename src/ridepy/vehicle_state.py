@@ -29,11 +29,20 @@ class VehicleState:
     """
 
     def recompute_arrival_times_drive_first(self):
+        if len(self.stoplist) < 2:
+            return
+
+        # query the travel times of all legs in a single batched call
+        locations = [stop.location for stop in self.stoplist]
+        leg_times = self.space.t_many(locations[:-1], locations[1:])
+
         # update CPATs
-        for stop_i, stop_j in zip(self.stoplist, self.stoplist[1:]):
-            stop_j.estimated_arrival_time = max(
-                stop_i.estimated_arrival_time, stop_i.time_window_min
-            ) + self.space.t(stop_i.location, stop_j.location)
+        for stop_i, stop_j, leg_time in zip(
+            self.stoplist, self.stoplist[1:], leg_times
+        ):
+            stop_j.estimated_arrival_time = (
+                max(stop_i.estimated_arrival_time, stop_i.time_window_min) + leg_time
+            )
 
     def __init__(
         self,
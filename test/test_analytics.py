@@ -32,6 +32,7 @@ from ridepy.util.analytics import (
     get_system_quantities,
     get_vehicle_quantities,
 )
+from ridepy.util.analytics.events import _downcast_numeric_columns
 from ridepy.util.analytics.stops import _add_insertion_stats_to_stoplist_dataframe
 from ridepy.util.analytics.plotting import plot_occupancy_hist
 from ridepy.vehicle_state import VehicleState
@@ -941,6 +942,73 @@ def test_get_stops_and_requests_with_actual_simulation():
     assert len(requests) == 1000
 
 
+def test_get_stops_and_requests_downcast():
+    space = Euclidean1D()
+    rg = RandomRequestGenerator(rate=10, space=space)
+    transportation_requests = list(it.islice(rg, 100))
+
+    fs = SlowSimpleFleetState(
+        initial_locations={k: 0 for k in range(10)},
+        seat_capacities=10,
+        space=space,
+        dispatcher=BruteForceTotalTravelTimeMinimizingDispatcher(),
+        vehicle_state_class=VehicleState,
+    )
+
+    events = list(fs.simulate(transportation_requests))
+
+    stops, requests = get_stops_and_requests(events=events, space=space)
+    stops_small, requests_small = get_stops_and_requests(
+        events=events, space=space, downcast=True
+    )
+
+    assert stops_small["delta_occupancy"].dtype == np.float32
+    assert stops_small["request_id"].dtype == np.int16
+    assert stops_small.memory_usage().sum() < stops.memory_usage().sum()
+
+    # the random timestamps are not representable in single precision
+    assert stops_small["timestamp"].dtype == np.float64
+
+    # downcasting is lossless
+    assert_frame_equal(stops, stops_small, check_dtype=False, check_exact=True)
+    assert_frame_equal(requests, requests_small, check_dtype=False, check_exact=True)
+
+    df = pd.DataFrame(
+        {
+            "exact": [0.5, 2000.0, nan],
+            "inexact": [0.5, 2000.0001, nan],
+            "pi": [3.14159265358979, 1.0, 2.0],
+        }
+    )
+    df_small = _downcast_numeric_columns(df.copy())
+    assert df_small["exact"].dtype == np.float32
+    assert df_small["inexact"].dtype == np.float64
+    assert df_small["pi"].dtype == np.float64
+    assert_frame_equal(df, df_small, check_dtype=False, check_exact=True)
+
+
+def test_get_stops_and_requests_from_iterator():
+    space = Euclidean1D()
+    rg = RandomRequestGenerator(rate=10, space=space)
+    transportation_requests = list(it.islice(rg, 100))
+
+    fs = SlowSimpleFleetState(
+        initial_locations={k: 0 for k in range(10)},
+        seat_capacities=10,
+        space=space,
+        dispatcher=BruteForceTotalTravelTimeMinimizingDispatcher(),
+        vehicle_state_class=VehicleState,
+    )
+
+    events = list(fs.simulate(transportation_requests))
+
+    stops, requests = get_stops_and_requests(events=events, space=space)
+    stops_it, requests_it = get_stops_and_requests(events=iter(events), space=space)
+
+    assert_frame_equal(stops, stops_it)
+    assert_frame_equal(requests, requests_it)
+
+
 def test_get_stops_and_requests_with_actual_simulation_none_accepted():
     space = Euclidean1D()
     rg = RandomRequestGenerator(rate=10, space=space)
@@ -1,8 +1,13 @@
+import random
+
 import numpy as np
 import pytest
 
 import itertools as it
 
+from copy import deepcopy
+
+from math import sqrt
 from numpy import inf, isclose
 
 from ridepy.events import (
@@ -10,12 +15,20 @@ from ridepy.events import (
     PickupEvent,
     DeliveryEvent,
 )
+from ridepy.data_structures import (
+    InternalRequest,
+    Stop,
+    StopAction,
+    TransportationRequest,
+    TransportSpace,
+)
 from ridepy.util.dispatchers.ridepooling import (
     BruteForceTotalTravelTimeMinimizingDispatcher,
+    _find_best_insertion,
 )
 from ridepy.extras.spaces import make_nx_grid
 from ridepy.util.request_generators import RandomRequestGenerator
-from ridepy.util.spaces import Euclidean2D, Graph
+from ridepy.util.spaces import Euclidean2D, Graph, Manhattan2D
 from ridepy.fleet_state import SlowSimpleFleetState
 from ridepy.util.testing_utils import setup_insertion_data_structures
 from ridepy.vehicle_state import VehicleState
@@ -497,6 +510,58 @@ def test_stoplist_not_modified_inplace(kind):
     assert stoplist[1].estimated_arrival_time == 3
 
 
+def test_input_stops_not_mutated():
+    # fmt: off
+    # location, cpat, tw_min, tw_max, occupancy
+    stoplist_properties = [
+        [(0, 0), 0, 0, inf, 0],
+        [(0, 2), 2, 0, inf, 1],
+        [(0, 4), 4, 0, inf, 2],
+        [(0, 6), 6, 7, inf, 1],
+        [(0, 9), 10, 0, inf, 0],
+    ]
+    # fmt: on
+    request_properties = dict(
+        request_id=42,
+        creation_timestamp=0,
+        origin=(1, 2),
+        destination=(1, 4),
+        pickup_timewindow_min=0,
+        pickup_timewindow_max=inf,
+        delivery_timewindow_min=0,
+        delivery_timewindow_max=inf,
+    )
+    (
+        space,
+        request,
+        stoplist,
+        brute_force_total_travel_time_minimizing_dispatcher,
+    ) = setup_insertion_data_structures(
+        stoplist_properties=stoplist_properties,
+        request_properties=request_properties,
+        space_type="Euclidean2D",
+        kind="python",
+    )
+    original_stoplist = deepcopy(stoplist)
+
+    min_cost, new_stoplist, *_ = brute_force_total_travel_time_minimizing_dispatcher(
+        request, stoplist, space, seat_capacity=10
+    )
+
+    # the insertion delays the later stops of the new stoplist...
+    assert new_stoplist[2].location == request.origin
+    assert new_stoplist[3].location == request.destination
+    assert [s.occupancy_after_servicing for s in new_stoplist] == [0, 1, 2, 1, 2, 1, 0]
+    assert new_stoplist[-1].estimated_arrival_time > stoplist[-1].estimated_arrival_time
+    # ...without touching any of the stops of the original one
+    assert stoplist == original_stoplist
+    assert not any(
+        new_stop is old_stop
+        for new_stop in new_stoplist[2:]
+        for old_stop in stoplist[1:]
+    )
+
+
 def test_sanity_in_graph():
     """
     Insert a request, note delivery time.
@@ -553,5 +618,168 @@ def test_sanity_in_graph():
                 )
 
 
+def test_scalar_only_space():
+    """
+    Spaces implementing only the scalar `TransportSpace.t` contract can be used
+    with the brute force dispatcher, and give the same results as the
+    equivalent built-in space.
+    """
+
+    class ScalarEuclidean2D(TransportSpace):
+        n_dim = 2
+
+        def d(self, u, v):
+            dx = v[0] - u[0]
+            dy = v[1] - u[1]
+            return sqrt(dx * dx + dy * dy)
+
+        def t(self, u, v):
+            return self.d(u, v)
+
+        def random_point(self):
+            return random.random(), random.random()
+
+        def interp_time(self, u, v, time_to_dest):
+            return self.interp_dist(u, v, time_to_dest)
+
+        def interp_dist(self, u, v, dist_to_dest):
+            fraction = dist_to_dest / self.d(u, v)
+            return (
+                v[0] - (v[0] - u[0]) * fraction,
+                v[1] - (v[1] - u[1]) * fraction,
+            ), 0
+
+        def asdict(self):
+            return {}
+
+    def simulate(space):
+        rg = RandomRequestGenerator(rate=10, space=space, seed=0)
+        fs = SlowSimpleFleetState(
+            initial_locations={k: (0, 0) for k in range(5)},
+            seat_capacities=4,
+            space=space,
+            dispatcher=BruteForceTotalTravelTimeMinimizingDispatcher(),
+            vehicle_state_class=VehicleState,
+        )
+        return list(fs.simulate(it.islice(rg, 100)))
+
+    assert simulate(ScalarEuclidean2D()) == simulate(Euclidean2D())
+
+
+def _find_best_insertion_reference(request, stoplist, space, seat_capacity):
+    """
+    Plain O(N^2) scan over all insertions without any pruning. Each insertion's
+    arrival times are recomputed from scratch along the new route.
+    """
+    locations = [stop.location for stop in stoplist]
+    old_arrival_times = [stop.estimated_arrival_time for stop in stoplist]
+    route_time = lambda route: sum(space.t(u, v) for u, v in zip(route, route[1:]))
+
+    min_cost = inf
+    best_insertion = None
+    for i in range(len(stoplist)):
+        for j in range(i, len(stoplist)):
+            if any(
+                stop.occupancy_after_servicing == seat_capacity
+                for stop in stoplist[i : j + 1]
+            ):
+                continue
+
+            # (location, time window min, index in the stoplist or None)
+            route = [
+                (stop.location, stop.time_window_min, k)
+                for k, stop in enumerate(stoplist)
+            ]
+            route.insert(
+                j + 1, (request.destination, request.delivery_timewindow_min, None)
+            )
+            route.insert(i + 1, (request.origin, request.pickup_timewindow_min, None))
+
+            arrival_times = [old_arrival_times[0]]
+            for (u, tw_min, _), (v, _, _) in zip(route, route[1:]):
+                arrival_times.append(max(arrival_times[-1], tw_min) + space.t(u, v))
+
+            if arrival_times[i + 1] > request.pickup_timewindow_max:
+                continue
+            if arrival_times[j + 2] > request.delivery_timewindow_max:
+                continue
+            if any(
+                arrival_time > stoplist[k].time_window_max
+                and arrival_time > old_arrival_times[k]
+                for (_, _, k), arrival_time in zip(route, arrival_times)
+                if k is not None
+            ):
+                continue
+
+            cost = route_time([location for location, _, _ in route]) - route_time(
+                locations
+            )
+            if cost < min_cost:
+                min_cost = cost
+                best_insertion = i, j
+
+    return min_cost, best_insertion
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_find_best_insertion_matches_unpruned_scan(seed):
+    """
+    The pruning of `_find_best_insertion` must not change its result. Locations
+    and time windows are integers on a small grid, so that the arithmetic is
+    exact and ties between insertions of equal cost are frequent.
+    """
+    rng = random.Random(seed)
+    space = Manhattan2D()
+    random_location = lambda: (rng.randint(0, 4), rng.randint(0, 4))
+    seat_capacity = 3
+
+    for _ in range(50):
+        n_stops = rng.randint(1, 8)
+        stoplist = []
+        arrival_time = rng.randint(0, 5)
+        for k in range(n_stops):
+            location = random_location()
+            if k:
+                arrival_time = max(
+                    arrival_time, stoplist[-1].time_window_min
+                ) + space.t(stoplist[-1].location, location)
+            time_window_min = arrival_time + rng.choice([-3, 0, 0, 2])
+            # zero slack, some slack, no constraint, or already violated
+            time_window_max = arrival_time + rng.choice([0, 0, 2, 5, inf, -1])
+            stoplist.append(
+                Stop(
+                    location=location,
+                    request=InternalRequest(
+                        request_id=-1, creation_timestamp=0, location=location
+                    ),
+                    action=StopAction.internal,
+                    estimated_arrival_time=arrival_time,
+                    occupancy_after_servicing=rng.randint(0, seat_capacity),
+                    time_window_min=time_window_min,
+                    time_window_max=time_window_max,
+                )
+            )
+
+        origin = random_location()
+        destination = random_location()
+        pickup_timewindow_min = stoplist[0].estimated_arrival_time + rng.randint(0, 5)
+        pickup_timewindow_max = pickup_timewindow_min + rng.choice([0, 3, 10, inf])
+        delivery_timewindow_max = pickup_timewindow_min + rng.choice([5, 10, 20, inf])
+        request = TransportationRequest(
+            request_id=0,
+            creation_timestamp=0,
+            origin=origin,
+            destination=destination,
+            pickup_timewindow_min=pickup_timewindow_min,
+            pickup_timewindow_max=pickup_timewindow_max,
+            delivery_timewindow_min=pickup_timewindow_min,
+            delivery_timewindow_max=delivery_timewindow_max,
+        )
+
+        assert _find_best_insertion(
+            request, stoplist, space, seat_capacity
+        ) == _find_best_insertion_reference(request, stoplist, space, seat_capacity)
+
+
 if __name__ == "__main__":
     pytest.main(args=[__file__])
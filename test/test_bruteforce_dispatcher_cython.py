@@ -127,8 +127,8 @@ def test_equivalence_simulator_cython_and_python_bruteforce_dispatcher(seed=42):
     """
     for py_space, cy_space in (
         (pyspaces.Euclidean2D(), cyspaces.Euclidean2D()),
-        # DO NOT test graph spaces for now, as we use different methods for computing the shortest path
-        # (floyd-warshall in Python and dijkstra in C++. Therefore differences in interpolation arise.)
+        # DO NOT test graph spaces for now: Python and C++ both use Dijkstra, but may pick different
+        # ones of several equally short paths. Therefore differences in interpolation arise.
         # (
         #     pyspaces.Graph.from_nx(make_nx_grid()),
         #     cyspaces.Graph.from_nx(make_nx_grid()),
@@ -252,3 +252,61 @@ def test_sanity_in_graph():
                     delivery_times[rid] - pickup_times[rid],
                     space.t(req.origin, req.destination),
                 )
+
+
+def test_equivalence_cython_and_python_delay_propagation_through_slack():
+    """
+    Tests that a delay which is partially absorbed by a stop's slack time is
+    propagated identically to the later stops by both dispatchers.
+    """
+    # The vehicle would wait at the first stop until t=1.2, so that the delay
+    # caused by inserting the request before it is only partially absorbed.
+    stoplist_properties = [
+        [(0, 0), 0, 0, inf],
+        [(1, 0), 1, 1.2, inf],
+        [(2, 0), 2.2, 0, inf],
+        [(3, 0), 3.2, 0, inf],
+    ]
+    seat_capacity = 4
+
+    solutions = {}
+    for kind, ds, spaces, dispatcher in (
+        (
+            "python",
+            pyds,
+            pyspaces,
+            BruteForceTotalTravelTimeMinimizingDispatcher(),
+        ),
+        (
+            "cython",
+            cyds,
+            cyspaces,
+            CyBruteForceTotalTravelTimeMinimizingDispatcher(LocType.R2LOC),
+        ),
+    ):
+        space = spaces.Euclidean2D()
+        stoplist = stoplist_from_properties(
+            stoplist_properties=stoplist_properties, kind=kind, space=space
+        )
+        request = ds.TransportationRequest(
+            request_id=100,
+            creation_timestamp=0,
+            origin=(0.5, 0.5),
+            destination=(0.5, 0.5),
+            pickup_timewindow_min=0,
+            pickup_timewindow_max=inf,
+            delivery_timewindow_min=0,
+            delivery_timewindow_max=inf,
+        )
+        solutions[kind] = dispatcher(request, stoplist, space, seat_capacity)
+
+    py_min_cost, py_new_stoplist, _ = solutions["python"]
+    cy_min_cost, cy_new_stoplist, _ = solutions["cython"]
+
+    assert np.isclose(py_min_cost, cy_min_cost)
+    assert [stop.estimated_arrival_time for stop in py_new_stoplist] == pytest.approx(
+        [stop.estimated_arrival_time for stop in cy_new_stoplist]
+    )
+    # the first stop now departs at 2**.5 instead of 1.2
+    assert cy_new_stoplist[-2].estimated_arrival_time == pytest.approx(2**0.5 + 1)
+    assert cy_new_stoplist[-1].estimated_arrival_time == pytest.approx(2**0.5 + 2)
@@ -5,6 +5,7 @@ import re
 
 import itertools as it
 import numpy as np
+import networkx as nx
 
 from ridepy.extras.io import (
     save_params_json,
@@ -43,6 +44,31 @@ def test_spaces():
     assert ring.size() == 10
 
 
+@pytest.mark.parametrize("periodic", [False, True])
+@pytest.mark.parametrize("dim", [(1, 1), (1, 4), (2, 3), (3, 3), (5, 4)])
+def test_grid_matches_networkx(dim, periodic):
+    reference = nx.grid_graph(dim=dim, periodic=periodic)
+    nx.set_edge_attributes(reference, 2, "distance")
+    reference = nx.relabel.convert_node_labels_to_integers(
+        reference, label_attribute="location"
+    )
+    grid = make_nx_grid(dim=dim, periodic=periodic, edge_distance=2)
+
+    assert list(grid.nodes(data=True)) == list(reference.nodes(data=True))
+    assert list(grid.edges(data=True)) == list(reference.edges(data=True))
+    assert all(list(grid.adj[u]) == list(reference.adj[u]) for u in grid)
+
+
+def test_cycle_graph_matches_networkx():
+    for order in range(6):
+        reference = nx.generators.classic.cycle_graph(n=order)
+        ring = make_nx_cycle_graph(order=order)
+
+        assert list(ring.nodes) == list(reference.nodes)
+        assert list(ring.edges) == list(reference.edges)
+        assert all(d == 1 for *_, d in ring.edges(data="distance"))
+
+
 @pytest.mark.skipif(
     "GITLAB_CI" in os.environ, reason="does not pass in GitLab CI because num_cpu is 1"
 )
@@ -26,3 +26,13 @@ def test_random_request_generator_no_trivial():
     for space in [Graph.from_nx(make_nx_grid()), Euclidean1D(), Euclidean2D()]:
         rg = RandomRequestGenerator(space=space)
         assert all(req.origin != req.destination for req in it.islice(rg, 10000))
+
+
+def test_random_request_generator_rate_change():
+    rg = iter(RandomRequestGenerator(space=Euclidean2D(), rate=1))
+    next(rg)
+
+    # a changed rate applies to the very next request
+    rg.rate = 1e6
+    previous_timestamp = next(rg).creation_timestamp
+    assert next(rg).creation_timestamp - previous_timestamp < 1e-3
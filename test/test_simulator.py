@@ -22,6 +22,12 @@ from ridepy.util.dispatchers.taxicab import TaxicabDispatcherDriveFirst
 from ridepy.util.request_generators import RandomRequestGenerator
 from ridepy.util.spaces import Euclidean1D, Euclidean2D
 from ridepy.vehicle_state import VehicleState
+from ridepy import data_structures_cython as cyds
+from ridepy.util.dispatchers_cython import (
+    TaxicabDispatcherDriveFirst as CyTaxicabDispatcherDriveFirst,
+)
+from ridepy.util.spaces_cython import Euclidean2D as CyEuclidean2D
+from ridepy.vehicle_state_cython import VehicleState as CyVehicleState
 
 
 def test_slow_simple_fleet_state_simulate():
@@ -254,6 +260,50 @@ def test_with_taxicab_one_taxi_delivered_with_delay():
     assert actual_req_delivery_times == correct_req_delivery_times
 
 
+def test_equivalence_cython_and_python_taxicab_dispatcher(seed=42):
+    """
+    Tests that simulations using the pure Python and the Cython taxicab
+    dispatcher produce the same events.
+    """
+    n_reqs = 300
+    events = {}
+    for space, request_cls, dispatcher, vehicle_state_class in (
+        (
+            Euclidean2D(),
+            TransportationRequest,
+            TaxicabDispatcherDriveFirst(),
+            VehicleState,
+        ),
+        (
+            CyEuclidean2D(),
+            cyds.TransportationRequest,
+            CyTaxicabDispatcherDriveFirst(loc_type=CyEuclidean2D().loc_type),
+            CyVehicleState,
+        ),
+    ):
+        rg = RandomRequestGenerator(
+            space=space, request_cls=request_cls, seed=seed, rate=10
+        )
+        fs = SlowSimpleFleetState(
+            initial_locations={k: (0, 0) for k in range(10)},
+            seat_capacities=1,
+            space=space,
+            dispatcher=dispatcher,
+            vehicle_state_class=vehicle_state_class,
+        )
+        events[vehicle_state_class] = list(fs.simulate(list(it.islice(rg, n_reqs))))
+
+    py_events, cy_events = events[VehicleState], events[CyVehicleState]
+    assert len(py_events) == len(cy_events)
+    for py_event, cy_event in zip(py_events, cy_events):
+        assert py_event.keys() == cy_event.keys()
+        for key, py_value in py_event.items():
+            if isinstance(py_value, float):
+                assert np.isclose(py_value, cy_event[key])
+            else:
+                assert py_value == cy_event[key]
+
+
 if __name__ == "__main__":
     pytest.main(args=[__file__])
 #
@@ -1,3 +1,4 @@
+import dataclasses
 import pytest
 import numpy as np
 import pandas as pd
@@ -106,6 +107,32 @@ def test_smartVectorize():
             w3(y, z)
 
 
+def test_smartVectorize_single_coordinates():
+    class Phony:
+        def __init__(self):
+            self.n_dim = 2
+
+        @smartVectorize
+        def foo(self, u, v):
+            return u[0] * v[1]
+
+    phony = Phony()
+
+    # single coordinates are passed to the base function, no matter their type...
+    assert phony.foo((2, 3), (np.float64(0.5), 4)) == 8
+    assert phony.foo([2, 3], np.array([0.5, 4])) == 8
+    # ...and bunches of them are still looped over
+    assert np.array_equal(phony.foo([(2, 3), (1, 1)], [(0, 4), (5, 6)]), [8, 6])
+    # single coordinates are broadcast against bunches of them...
+    assert np.array_equal(phony.foo((2, 3), [(0, 4), (5, 6)]), [8, 12])
+    assert np.array_equal(phony.foo([(2, 3), (1, 1)], v=(0, 4)), [8, 4])
+    # ...as long as their shapes are compatible
+    with pytest.raises(ValueError, match=r"shapes must match"):
+        phony.foo((2, 3, 4), [(0, 4), (5, 6)])
+    with pytest.raises(ValueError, match=r"3-dimension.*expected 2 dim"):
+        phony.foo(np.zeros((2, 2, 2)), np.zeros((2, 2, 2)))
+
+
 def test_make_dict():
     transreq_dict = dict(
         request_id=1,
@@ -146,4 +173,34 @@ def test_make_dict():
     assert make_dict(cy_intreq) == intreq_dict
 
     assert make_dict(py_stop) == get_stop_dict(transreq_dict, pyStopAction.pickup)
+    assert make_dict(py_stop) == dataclasses.asdict(py_stop)
     assert make_dict(cy_stop) == get_stop_dict(transreq_dict, CyStopAction.pickup)
+
+
+def test_make_dict_nested_containers():
+    @dataclasses.dataclass
+    class Container:
+        location: tuple
+        stops: list
+        stops_by_id: dict
+        pair: tuple
+
+    transreq = pyTransportationRequest(
+        request_id=1, creation_timestamp=2, origin=(0, 1), destination=(2, 3)
+    )
+    stop = pyStop(
+        location=(0, 1),
+        request=transreq,
+        action=pyStopAction.pickup,
+        estimated_arrival_time=3,
+    )
+    container = Container(
+        location=(0.5, 1.5),
+        stops=[stop, stop],
+        stops_by_id={"a": stop},
+        pair=(transreq, 42),
+    )
+
+    assert make_dict(container) == dataclasses.asdict(container)
+    assert type(make_dict(container)["pair"]) is tuple
+    assert make_dict(container)["stops"][0]["request"]["origin"] == (0, 1)
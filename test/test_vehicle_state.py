@@ -1,6 +1,7 @@
 import pytest
 import random
 
+import math as m
 import numpy as np
 
 from ridepy.vehicle_state import VehicleState as PyVehicleState
@@ -9,6 +10,7 @@ from ridepy.data_structures import (
     InternalRequest as PyInternalRequest,
     StopAction as PyStopAction,
     TransportationRequest as PyTransportationRequest,
+    TransportSpace,
 )
 from ridepy.util.spaces import Euclidean2D as PyEuclidean2D, Graph as PyGraph
 from ridepy.util.dispatchers.ridepooling import (
@@ -220,3 +222,76 @@ def test_fast_forward_time(backend, space):
     loc, jump_time = do_location, 0
     assert vehicle_state.stoplist[0].location == loc
     assert vehicle_state.stoplist[0].estimated_arrival_time == t + jump_time
+
+
+class ScalarEuclidean2D(TransportSpace):
+    """
+    Euclidean plane implementing only the scalar `TransportSpace` methods.
+    """
+
+    n_dim = 2
+
+    def d(self, u, v):
+        return m.dist(u, v)
+
+    def t(self, u, v):
+        return self.d(u, v)
+
+    def random_point(self):
+        return random.random(), random.random()
+
+    def interp_time(self, u, v, time_to_dest):
+        return self.interp_dist(u, v, time_to_dest)
+
+    def interp_dist(self, u, v, dist_to_dest):
+        fraction = dist_to_dest / self.d(u, v)
+        return (v[0] - (v[0] - u[0]) * fraction, v[1] - (v[1] - u[1]) * fraction), 0
+
+    def asdict(self):
+        return {}
+
+
+@pytest.mark.parametrize("space", ["euclid2d", "grid", "scalar"])
+def test_recompute_arrival_times_drive_first(space):
+    random.seed(42)
+
+    if space == "euclid2d":
+        space = PyEuclidean2D()
+    elif space == "scalar":
+        space = ScalarEuclidean2D()
+    elif space == "grid":
+        space = PyGraph.from_nx(make_nx_grid())
+    else:
+        raise ValueError
+
+    locations = [space.random_point() for _ in range(5)]
+    time_window_mins = [0, 0, 10, 0, 0]
+    stoplist = [
+        PyStop(
+            location=location,
+            request=PyInternalRequest(
+                request_id=-1, creation_timestamp=0, location=location
+            ),
+            action=PyStopAction.internal,
+            estimated_arrival_time=0,
+            occupancy_after_servicing=0,
+            time_window_min=time_window_min,
+            time_window_max=np.inf,
+        )
+        for location, time_window_min in zip(locations, time_window_mins)
+    ]
+    vehicle_state = PyVehicleState(
+        vehicle_id=0,
+        initial_stoplist=stoplist,
+        space=space,
+        dispatcher=PyBruteForceTotalTravelTimeMinimizingDispatcher(),
+        seat_capacity=8,
+    )
+    vehicle_state.recompute_arrival_times_drive_first()
+
+    expected_arrival_time = 0
+    for stop_before, stop in zip(stoplist, stoplist[1:]):
+        expected_arrival_time = max(
+            expected_arrival_time, stop_before.time_window_min
+        ) + space.t(stop_before.location, stop.location)
+        assert stop.estimated_arrival_time == expected_arrival_time